@@ -5,11 +5,41 @@ Handles loading and parsing of TOML configuration files containing
 email credentials and inventory paths.
 """
 
+import functools
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
-import toml
+# Resolved once at import; Path.home() re-expands "~" on every call
+_HOME_CONFIG_DIR = Path.home() / ".miniupdate"
+
+
+def _path_exists(path: Path) -> bool:
+    """Check for an existing path with a single stat() call."""
+    try:
+        os.stat(path)
+    except OSError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_toml(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parse a TOML file, memoized on its path, modification time and size.
+
+    The mtime/size arguments are only part of the cache key, so editing the
+    file transparently invalidates the cached result. The returned dict is
+    shared between callers and must be treated as read-only.
+    """
+    # Imported lazily so the parser stays off the module import path
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+
+    data = Path(path).read_bytes()
+    return tomllib.loads(data.decode("utf-8"))
 
 
 class Config:
@@ -25,6 +55,9 @@ class Config:
         """
         self.config_path = self._find_config_path(config_path)
         self.config = self._load_config()
+        # Resolved on first access; functools.cached_property needs Python 3.8
+        self._inventory_path: Optional[str] = None
+        self._smtp_config: Optional[Dict[str, Any]] = None
 
     def _find_config_path(self, config_path: Optional[str]) -> Path:
         """Find configuration file path."""
@@ -33,34 +66,44 @@ class Config:
 
         # Check current directory
         current_config = Path("config.toml")
-        if current_config.exists():
+        if _path_exists(current_config):
             return current_config
 
         # Check home directory
-        home_config = Path.home() / ".miniupdate" / "config.toml"
-        if home_config.exists():
+        home_config = _HOME_CONFIG_DIR / "config.toml"
+        if _path_exists(home_config):
             return home_config
 
         # Default to current directory config.toml (may not exist yet)
         return current_config
 
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from TOML file."""
-        if not self.config_path.exists():
+        """Load configuration from TOML file (cached until the file changes)."""
+        try:
+            st = self.config_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"Configuration file not found at {self.config_path}. "
                 f"Please create a config.toml file or see config.toml.example"
-            )
+            ) from None
 
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                return toml.load(f)
-        except Exception as e:
+            return _parse_toml(
+                str(self.config_path.absolute()), st.st_mtime_ns, st.st_size
+            )
+        # TOMLDecodeError and UnicodeDecodeError are both ValueError subclasses
+        except (ValueError, OSError) as e:
             raise ValueError(f"Error parsing configuration file: {e}") from e
 
     @property
     def smtp_config(self) -> Dict[str, Any]:
-        """Get SMTP configuration."""
+        """Get SMTP configuration (validated on first access)."""
+        if self._smtp_config is None:
+            self._smtp_config = self._validate_smtp_config()
+        return self._smtp_config
+
+    def _validate_smtp_config(self) -> Dict[str, Any]:
+        """Validate and return the [email] section."""
         if "email" not in self.config:
             raise ValueError("No [email] section found in configuration")
 
@@ -75,7 +118,13 @@ class Config:
 
     @property
     def inventory_path(self) -> str:
-        """Get Ansible inventory path with environment variable expansion."""
+        """Get Ansible inventory path with environment variable expansion (resolved once)."""
+        if self._inventory_path is None:
+            self._inventory_path = self._resolve_inventory_path()
+        return self._inventory_path
+
+    def _resolve_inventory_path(self) -> str:
+        """Resolve the configured inventory path."""
         if "inventory" not in self.config:
             raise ValueError("No [inventory] section found in configuration")
 
@@ -105,6 +154,11 @@ class Config:
         """Get SSH configuration."""
         return self.config.get("ssh", {})
 
+    @property
+    def settings_config(self) -> Dict[str, Any]:
+        """Get general settings."""
+        return self.config.get("settings", {})
+
     @property
     def proxmox_config(self) -> Dict[str, Any]:
         """Get Proxmox configuration."""
@@ -132,6 +186,8 @@ class Config:
 
 def create_example_config(path: str = "config.toml.example") -> None:
     """Create an example configuration file."""
+    import tomli_w
+
     example_config = {
         "email": {
             "smtp_server": "smtp.gmail.com",
@@ -141,6 +197,8 @@ def create_example_config(path: str = "config.toml.example") -> None:
             "password": "your-app-password",
             "from_email": "your-email@example.com",
             "to_email": ["sysadmin@example.com", "admin@example.com"],
+            "send_when_clean": True,
+            "html_attachment_threshold": 0,
         },
         "inventory": {
             # Local inventory file (relative to config file)
@@ -156,11 +214,13 @@ def create_example_config(path: str = "config.toml.example") -> None:
             # "path": "/shared/ansible-configs/production/inventory.yml",
             "format": "ansible",
         },
-        "ssh": {"timeout": 30, "key_file": None, "username": None, "port": 22},
+        # key_file and username are optional and left unset (TOML has no null)
+        "ssh": {"timeout": 30, "port": 22, "keepalive_interval": 30},
         "settings": {
             "parallel_connections": 5,
             "log_level": "INFO",
             "check_timeout": 120,
+            "os_info_cache_days": 1,
         },
         "proxmox": {
             "endpoint": "https://pve.example.com:8006",
@@ -185,4 +245,4 @@ def create_example_config(path: str = "config.toml.example") -> None:
     }
 
     with open(path, "w", encoding="utf-8") as f:
-        toml.dump(example_config, f)
+        f.write(tomli_w.dumps(example_config))
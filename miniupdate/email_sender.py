@@ -4,17 +4,21 @@ Email sender for miniupdate.
 Sends update reports via SMTP email.
 """
 
+import gzip
+import io
 import smtplib
+import textwrap
 import logging
-import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+import queue
+import threading
+import time
+from collections import defaultdict
+from email.message import EmailMessage
 from email.policy import SMTP
 from datetime import datetime
+from enum import Enum
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, NamedTuple, TextIO, Tuple
 from .package_managers import PackageUpdate
 from .inventory import Host
 from .os_detector import OSInfo
@@ -22,9 +26,36 @@ from .os_detector import OSInfo
 logger = logging.getLogger(__name__)
 
 
+class UpdateResult(Enum):
+    """Update operation results."""
+
+    SUCCESS = "success"
+    OPT_OUT = "opt_out"
+    NO_UPDATES = "no_updates"
+    FAILED_SNAPSHOT = "failed_snapshot"
+    FAILED_UPDATES = "failed_updates"
+    FAILED_REBOOT = "failed_reboot"
+    FAILED_AVAILABILITY = "failed_availability"
+    REVERTED = "reverted"
+    REVERT_FAILED = "revert_failed"
+
+
 class UpdateReport:
     """Contains update information for a single host."""
 
+    __slots__ = (
+        "host",
+        "os_info",
+        "updates",
+        "error",
+        "command_output",
+        "timestamp",
+        "security_updates",
+        "regular_updates",
+        "has_security_updates",
+        "has_updates",
+    )
+
     def __init__(
         self,
         host: Host,
@@ -40,33 +71,392 @@ class UpdateReport:
         self.command_output = command_output  # Store stdout/stderr from failed commands
         self.timestamp = datetime.now()
 
-    @property
-    def has_updates(self) -> bool:
-        """Check if host has available updates."""
-        return len(self.updates) > 0
+        # Partition once; reports are built with their final update list and
+        # the sort keys and templates read these repeatedly
+        self.security_updates = []
+        self.regular_updates = []
+        for update in updates:
+            if update.security:
+                self.security_updates.append(update)
+            else:
+                self.regular_updates.append(update)
+        self.has_security_updates = bool(self.security_updates)
+        self.has_updates = bool(updates)
+
+
+# Static document head for the check report; only the header varies per send
+_CHECK_HTML_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background-color: #f0f0f0; padding: 15px; border-radius: 5px; }
+        .summary { margin: 20px 0; }
+        .host { margin: 15px 0; padding: 10px; border: 1px solid #ddd; border-radius: 5px; }
+        .host-name { font-weight: bold; font-size: 1.1em; color: #333; }
+        .os-info { color: #666; font-size: 0.9em; }
+        .security { background-color: #ffe6e6; border-color: #ff9999; }
+        .no-updates { background-color: #e6ffe6; border-color: #99ff99; }
+        .error { background-color: #fff0e6; border-color: #ffcc99; }
+        .updates-list { margin: 10px 0; }
+        .update-item { margin: 5px 0; padding: 5px; background-color: #f9f9f9; }
+        .security-update { background-color: #ffeeee; font-weight: bold; }
+        table { border-collapse: collapse; width: 100%; margin: 10px 0; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #f2f2f2; }
+    </style>
+</head>
+<body>
+"""
+
+_CHECK_HEADER_HTML = """
+            <div class="header">
+                <h2>System Updates Report</h2>
+                <p>Generated on: {timestamp}</p>
+            </div>
+        """
+
+_HTML_FOOTER = """
+</body>
+</html>
+"""
+
+# Shown in place of the host details when the full report is attached
+_ATTACHED_REPORT_HTML = """
+    <p><strong>The full report was too large to include inline and is attached as {filename}.</strong></p>
+"""
+
+# Per-host block of the check report; every field is inserted already escaped
+_HOST_HTML = (
+    '<div class="{css_class}">'
+    '<div class="host-name">{name} ({hostname})</div>'
+    "{os_block}{body}</div>"
+)
+_HOST_OS_HTML = '<div class="os-info">{os_info}</div>'
+_HOST_ERROR_HTML = '<div style="color: red;">Error: {error}</div>'
+_HOST_COMMAND_OUTPUT_HTML = (
+    "<div><strong>Command Output:</strong>"
+    '<pre style="white-space: pre-wrap; font-size: 12px; max-height: 300px; '
+    "overflow-y: auto; background-color: #f8f8f8; padding: 8px; "
+    'border-radius: 3px;">{output}</pre></div>'
+)
+_HOST_NO_UPDATES_HTML = '<div style="color: green;">✓ No updates available</div>'
+_SECURITY_UPDATES_HTML = (
+    '<div><strong style="color: red;">Security Updates ({count}):</strong></div>'
+    '<div class="updates-list">{rows}</div>'
+)
+_REGULAR_UPDATES_HTML = (
+    "<div><strong>Regular Updates ({count}):</strong></div>"
+    '<div class="updates-list">{rows}</div>'
+)
+_SECURITY_UPDATE_HTML = '<div class="update-item security-update">🔒 {update}</div>'
+_REGULAR_UPDATE_HTML = '<div class="update-item">{update}</div>'
+
+
+# Static layout of the automated update report
+_AUTOMATED_HTML_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
+        .container { max-width: 800px; margin: 0 auto; background-color: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; margin: -20px -20px 20px -20px; border-radius: 8px 8px 0 0; }
+        .summary { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; border-left: 4px solid #007bff; }
+        .host { margin: 15px 0; padding: 15px; border-radius: 5px; border-left: 4px solid #28a745; }
+        .host.critical { border-left-color: #dc3545; background-color: #fff5f5; }
+        .host.reverted { border-left-color: #ffc107; background-color: #fffbf0; }
+        .host.failed { border-left-color: #fd7e14; background-color: #fff8f0; }
+        .host.success { border-left-color: #28a745; background-color: #f8fff8; }
+        .host.no-updates { border-left-color: #6c757d; background-color: #f8f9fa; }
+        .host-name { font-weight: bold; font-size: 16px; margin-bottom: 5px; }
+        .host-details { color: #666; font-size: 14px; margin-bottom: 10px; }
+        .status { font-weight: bold; padding: 4px 8px; border-radius: 3px; display: inline-block; }
+        .status.success { background-color: #d4edda; color: #155724; }
+        .status.critical { background-color: #f8d7da; color: #721c24; }
+        .status.reverted { background-color: #fff3cd; color: #856404; }
+        .status.failed { background-color: #fdecea; color: #b52d3a; }
+        .updates-list { margin-top: 10px; }
+        .update-item { background-color: #e9ecef; padding: 5px 8px; margin: 2px 0; border-radius: 3px; }
+        .security-update { background-color: #f8d7da; color: #721c24; font-weight: bold; }
+        .error-details { background-color: #f8d7da; color: #721c24; padding: 8px; border-radius: 3px; margin-top: 5px; }
+        .timing { color: #666; font-size: 12px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+"""
+
+_AUTOMATED_HTML_FOOTER = """
+    </div>
+</body>
+</html>
+"""
+
+_UNMAPPED_HOSTS_HTML_HEAD = """
+<div class="summary" style="background-color: #f8d7da; border: 1px solid #f5c6cb; color: #721c24; padding: 15px; border-radius: 5px; margin: 20px 0;">
+    <h2 style="color: #721c24;">🚨 Configuration Warning: Unmapped Inventory Hosts</h2>
+    <p><strong>The following hosts are not configured in either the VM mapping file or the opt-out list:</strong></p>
+    <ul>
+"""
+
+_UNMAPPED_HOSTS_HTML_TAIL = """
+    </ul>
+    <p><strong>Action Required:</strong></p>
+    <ul>
+        <li>Add these hosts to your <code>vm_mapping.toml</code> file if they should receive automated updates, OR</li>
+        <li>Add them to the <code>opt_out_hosts</code> list in <code>config.toml</code> if they should only be checked (no automated updates)</li>
+    </ul>
+    <p><em>Without proper configuration, these hosts may not behave as expected during automated updates.</em></p>
+</div>
+"""
+
+_UNMAPPED_HOSTS_TEXT_HEAD = f"""🚨 CONFIGURATION WARNING: UNMAPPED INVENTORY HOSTS
+{"=" * 60}
+The following hosts are not configured in either the VM mapping
+file or the opt-out list:
+
+"""
+
+_UNMAPPED_HOSTS_TEXT_TAIL = """
+ACTION REQUIRED:
+- Add these hosts to your vm_mapping.toml file if they should
+  receive automated updates, OR
+- Add them to the opt_out_hosts list in config.toml if they
+  should only be checked (no automated updates)
 
-    @property
-    def has_security_updates(self) -> bool:
-        """Check if host has security updates."""
-        return any(update.security for update in self.updates)
+Without proper configuration, these hosts may not behave as
+expected during automated updates.
+
+"""
 
-    @property
-    def security_updates(self) -> List[PackageUpdate]:
-        """Get only security updates."""
-        return [update for update in self.updates if update.security]
 
-    @property
-    def regular_updates(self) -> List[PackageUpdate]:
-        """Get only regular (non-security) updates."""
-        return [update for update in self.updates if not update.security]
+# Failed results in workflow order: snapshot, updates, reboot, availability
+_FAILED_RESULTS = (
+    UpdateResult.FAILED_SNAPSHOT,
+    UpdateResult.FAILED_UPDATES,
+    UpdateResult.FAILED_REBOOT,
+    UpdateResult.FAILED_AVAILABILITY,
+)
+
+# Display name per result, e.g. "Failed Snapshot"
+_RESULT_PRETTY = {
+    result: result.value.replace("_", " ").title() for result in UpdateResult
+}
+
+# Automated host status by UpdateResult: (css class, status class, text)
+_AUTOMATED_HTML_STATUS = {
+    UpdateResult.REVERT_FAILED: (
+        "host critical",
+        "status critical",
+        "CRITICAL: Revert Failed",
+    ),
+    UpdateResult.REVERTED: ("host reverted", "status reverted", "Reverted to Snapshot"),
+    **{
+        result: ("host failed", "status failed", f"Failed: {_RESULT_PRETTY[result]}")
+        for result in _FAILED_RESULTS
+    },
+    UpdateResult.SUCCESS: ("host success", "status success", "Successfully Updated"),
+    UpdateResult.OPT_OUT: ("host opt-out", "status warning", "Opt-out (Check Only)"),
+    UpdateResult.NO_UPDATES: ("host no-updates", "status success", "No Updates Needed"),
+}
+
+# Automated host status line of the text report, by UpdateResult
+_AUTOMATED_TEXT_STATUS = {
+    UpdateResult.REVERT_FAILED: "  Status: 🚨 CRITICAL - Revert Failed\n",
+    UpdateResult.REVERTED: "  Status: 🔄 Reverted to Snapshot\n",
+    **{
+        result: f"  Status: ❌ Failed - {_RESULT_PRETTY[result]}\n"
+        for result in _FAILED_RESULTS
+    },
+    UpdateResult.SUCCESS: "  Status: ✅ Successfully Updated\n",
+    UpdateResult.OPT_OUT: "  Status: ⚠️ Opt-out (Check Only)\n",
+    UpdateResult.NO_UPDATES: "  Status: 📋 No Updates Needed\n",
+}
+
+# Plain text report separator lines
+_SEP_EQ50 = "=" * 50 + "\n"
+_SEP_DASH20 = "-" * 20 + "\n"
+_SEP_DASH25 = "-" * 25 + "\n"
+_SEP_DASH30 = "-" * 30 + "\n"
+_SEP_DASH40 = "-" * 40 + "\n"
+_SEP_DASH50 = "-" * 50 + "\n"
+
+# SMTP replies that mean "try again later" (service unavailable, mailbox
+# busy, temporary auth failure); batched sends retry these with backoff
+_TRANSIENT_SMTP_CODES = frozenset({421, 450, 454})
+_BATCH_SEND_ATTEMPTS = 3
+_RETRY_INITIAL_DELAY = 2.0
+
+# Write buffer for saved HTML reports, so large reports need few write() calls
+_REPORT_WRITE_BUFFER = 1 << 20
+
+
+def _transient_smtp_code(error: smtplib.SMTPException) -> Optional[int]:
+    """Return the transient reply code behind an SMTP error, None if permanent."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        # Every refused recipient must have been deferred, not rejected
+        codes = {code for code, _message in error.recipients.values()}
+    else:
+        codes = {getattr(error, "smtp_code", None)}
+    if codes and codes <= _TRANSIENT_SMTP_CODES:
+        return min(codes)
+    return None
+
+
+# Same replacements as html.escape(quote=True), applied in one translate() pass
+_HTML_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+
+
+def _escape(text: str) -> str:
+    """Escape text for safe insertion into HTML."""
+    return text.translate(_HTML_ESCAPES)
+
+
+def _report_sort_key(report: UpdateReport):
+    """Order hosts with security updates first, then any updates, then by name."""
+    return (not report.has_security_updates, not report.has_updates, report.host.name)
+
+
+class ReportSummary(NamedTuple):
+    """Aggregate counters for a set of update reports."""
+
+    total_hosts: int
+    hosts_with_updates: int
+    hosts_with_errors: int
+    security_hosts: List[Tuple[str, int]]  # (host name, security update count)
+
+
+class ResultBuckets(NamedTuple):
+    """Automated update reports grouped by result, with applied-update totals."""
+
+    total_hosts: int
+    by_result: Dict[UpdateResult, List[Any]]  # reports in report order
+    updates_applied: int
+    security_updates_applied: int
+
+
+def _failed_hosts(by_result: Dict[UpdateResult, List[Any]]) -> List[Any]:
+    """Collect failed reports in _FAILED_RESULTS (workflow) order."""
+    return [report for result in _FAILED_RESULTS for report in by_result[result]]
+
+
+class ResultCounts(NamedTuple):
+    """Per-outcome host counts for an automated update run."""
+
+    successful: int
+    no_updates: int
+    opt_out: int
+    critical: int
+    reverted: int
+    failed: int
+
+
+# Automated subject lines, checked in priority order; the first match wins
+_AUTOMATED_SUBJECT_RULES = (
+    (
+        lambda c: c.critical > 0,
+        "🚨 URGENT: {critical} host(s) failed update+revert, {failed} other failures - miniupdate",
+    ),
+    (
+        lambda c: c.failed > 0 or c.reverted > 0,
+        "⚠️ Update Issues: {failed} failed, {reverted} reverted, {successful} success - miniupdate",
+    ),
+    (
+        lambda c: c.successful > 0 and c.opt_out > 0,
+        "✅ Updates Applied: {successful} updated, {opt_out} opt-out, {no_updates} up-to-date - miniupdate",
+    ),
+    (
+        lambda c: c.successful > 0,
+        "✅ Updates Applied: {successful} updated, {no_updates} up-to-date - miniupdate",
+    ),
+    (
+        lambda c: c.opt_out > 0,
+        "📋 Check Complete: {opt_out} opt-out (manual updates needed), {no_updates} up-to-date - miniupdate",
+    ),
+)
+_AUTOMATED_SUBJECT_DEFAULT = (
+    "📋 No Updates Needed: {no_updates} hosts checked - miniupdate"
+)
+
+
+class _TeeWriter:
+    """Text sink that mirrors every write into a buffer and a report file."""
+
+    def __init__(self, buffer: TextIO, report_file: TextIO):
+        self._buffer = buffer
+        self.report_file: Optional[TextIO] = report_file
+
+    def write(self, text: str) -> int:
+        """Write text to the buffer and, while it is healthy, the report file."""
+        self._buffer.write(text)
+        if self.report_file is not None:
+            try:
+                self.report_file.write(text)
+            except OSError as e:
+                # A broken report file must not cost us the email body
+                logger.error("Failed to save HTML report: %s", e)
+                self.report_file = None
+        return len(text)
 
 
 class EmailSender:
-    """Handles sending email reports via SMTP."""
+    """
+    Handles sending email reports via SMTP.
+
+    Used as a context manager, the SMTP connection is opened on the first
+    send and reused for every message until the block exits. Outside a
+    ``with`` block each send opens and closes its own connection.
+    """
 
     def __init__(self, smtp_config: Dict[str, Any]):
         self.smtp_config = smtp_config
 
+        # Resolve settings once; they are read for every message sent
+        self._smtp_server = smtp_config["smtp_server"]
+        self._smtp_port = smtp_config["smtp_port"]
+        self._use_tls = smtp_config.get("use_tls", True)
+        self._username = smtp_config.get("username")
+        self._password = smtp_config.get("password")
+        self._from_email = smtp_config["from_email"]
+        to_emails = smtp_config["to_email"]
+        self._to_emails = [to_emails] if isinstance(to_emails, str) else list(to_emails)
+        self._to_header = ", ".join(self._to_emails)
+        self._send_when_clean = smtp_config.get("send_when_clean", True)
+        self._concurrency = max(1, int(smtp_config.get("concurrency", 4)))
+        # HTML bodies above this many bytes are attached gzipped (0, the
+        # default, always inlines them)
+        self._html_attachment_threshold = int(
+            smtp_config.get("html_attachment_threshold", 0)
+        )
+        self._server: Optional[smtplib.SMTP] = None
+        self._persistent = False
+
+    def __enter__(self) -> "EmailSender":
+        self._persistent = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._persistent = False
+        self.close()
+
+    def close(self) -> None:
+        """Close the SMTP connection if one is open."""
+        if self._server is None:
+            return
+
+        server, self._server = self._server, None
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            # Connection already dropped; just release the socket
+            server.close()
+        logger.debug("SMTP connection closed")
+
     def send_update_report(self, reports: List[UpdateReport]) -> bool:
         """
         Send update report email.
@@ -75,136 +465,302 @@ class EmailSender:
             reports: List of UpdateReport objects
 
         Returns:
-            True if email sent successfully, False otherwise
+            True if email sent successfully (or skipped because every host is
+            up to date and send_when_clean is disabled), False otherwise
         """
         try:
-            # Generate email content
-            subject = self._generate_subject(reports)
-            html_body = self._generate_html_body(reports)
-            text_body = self._generate_text_body(reports)
+            summary = self._summarize(reports)
+            now = datetime.now()
+            if self._skip_clean_report(summary):
+                # Keep the on-disk record of the run, but build no email
+                self._save_check_report(reports, summary, now)
+                return True
 
-            # Save HTML report to reports/ directory with datestamp
-            self._save_html_report(html_body, "check")
+            # Generate email content
+            # The HTML body is streamed to reports/ with a datestamp as it is built
+            subject, html_body, text_body = self._compose_update_report(
+                reports, summary, now, report_type="check"
+            )
 
             # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = self.smtp_config["from_email"]
-
-            # Handle multiple recipients
-            to_emails = self.smtp_config["to_email"]
-            if isinstance(to_emails, str):
-                to_emails = [to_emails]
-            msg["To"] = ", ".join(to_emails)
-
-            # Attach text and HTML versions
-            text_part = MIMEText(text_body, "plain", "utf-8")
-            html_part = MIMEText(html_body, "html", "utf-8")
-            msg.attach(text_part)
-            msg.attach(html_part)
+            msg = self._build_message(
+                subject,
+                text_body,
+                html_body,
+                f"check_report_{now:%Y%m%d_%H%M%S}.html.gz",
+                lambda filename: self._generate_check_summary_page(
+                    summary, now, filename
+                ),
+            )
 
             # Send email
-            return self._send_email(msg, to_emails)
+            return self._send_email(msg, self._to_emails)
 
         except Exception as e:
-            logger.error(f"Failed to send update report: {e}")
+            logger.error("Failed to send update report: %s", e)
             return False
 
-    def _generate_subject(self, reports: List[UpdateReport]) -> str:
-        """Generate email subject line."""
-        total_hosts = len(reports)
-        hosts_with_updates = sum(1 for report in reports if report.has_updates)
-        hosts_with_security = sum(
-            1 for report in reports if report.has_security_updates
-        )
+    def send_update_report_batch(
+        self, reports_per_recipient: Dict[str, List[UpdateReport]]
+    ) -> Dict[str, bool]:
+        """
+        Send a separate update report to each recipient over parallel SMTP sessions.
 
-        if hosts_with_security > 0:
-            return f"[SECURITY] System Updates Report: {hosts_with_security} hosts need security updates"
-        elif hosts_with_updates > 0:
-            return f"System Updates Report: {hosts_with_updates}/{total_hosts} hosts have updates available"
-        else:
-            return f"System Updates Report: All {total_hosts} hosts up to date"
-
-    def _generate_html_body(self, reports: List[UpdateReport]) -> str:
-        """Generate HTML email body."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .header {{ background-color: #f0f0f0; padding: 15px; border-radius: 5px; }}
-                .summary {{ margin: 20px 0; }}
-                .host {{ margin: 15px 0; padding: 10px; border: 1px solid #ddd; border-radius: 5px; }}
-                .host-name {{ font-weight: bold; font-size: 1.1em; color: #333; }}
-                .os-info {{ color: #666; font-size: 0.9em; }}
-                .security {{ background-color: #ffe6e6; border-color: #ff9999; }}
-                .no-updates {{ background-color: #e6ffe6; border-color: #99ff99; }}
-                .error {{ background-color: #fff0e6; border-color: #ffcc99; }}
-                .updates-list {{ margin: 10px 0; }}
-                .update-item {{ margin: 5px 0; padding: 5px; background-color: #f9f9f9; }}
-                .security-update {{ background-color: #ffeeee; font-weight: bold; }}
-                table {{ border-collapse: collapse; width: 100%; margin: 10px 0; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #f2f2f2; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h2>System Updates Report</h2>
-                <p>Generated on: {timestamp}</p>
-            </div>
+        Messages are queued and delivered by up to ``concurrency`` worker
+        threads (email setting, default 4), each holding its own SMTP
+        session. Transient 421/450/454 replies are retried with exponential
+        backoff. HTML copies of these reports are not saved to reports/.
+
+        Args:
+            reports_per_recipient: Mapping of recipient address to its UpdateReport list
+
+        Returns:
+            Mapping of recipient address to whether its report was sent
+            (or skipped as all-clean)
         """
+        results: Dict[str, bool] = {}
+        jobs: "queue.Queue[Optional[Tuple[str, EmailMessage]]]" = queue.Queue()
+        now = datetime.now()
+
+        for recipient, reports in reports_per_recipient.items():
+            summary = self._summarize(reports)
+            if self._skip_clean_report(summary):
+                results[recipient] = True
+                continue
+
+            subject, html_body, text_body = self._compose_update_report(
+                reports, summary, now
+            )
+            msg = self._build_message(
+                subject,
+                text_body,
+                html_body,
+                f"check_report_{now:%Y%m%d_%H%M%S}.html.gz",
+                # Bound as a default so the lambda does not close over the loop variable
+                lambda filename, summary=summary: self._generate_check_summary_page(
+                    summary, now, filename
+                ),
+                to_header=recipient,
+            )
+            jobs.put((recipient, msg))
+
+        def send_jobs(sender: Optional[EmailSender]) -> None:
+            # Every job taken gets a result, even if sending it blows up
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                recipient, msg = job
+                results[recipient] = False
+                if sender is None:
+                    continue
+                try:
+                    results[recipient] = sender.send_message(
+                        msg, [recipient], attempts=_BATCH_SEND_ATTEMPTS
+                    )
+                except Exception as e:
+                    logger.error("Failed to send report to %s: %s", recipient, e)
+
+        def worker() -> None:
+            try:
+                sender = EmailSender(self.smtp_config)
+            except Exception as e:
+                logger.error("Failed to set up SMTP batch worker: %s", e)
+                send_jobs(None)
+                return
+            with sender:
+                send_jobs(sender)
+
+        worker_count = min(self._concurrency, jobs.qsize())
+        for _ in range(worker_count):
+            jobs.put(None)  # one stop sentinel per worker
+
+        threads = [threading.Thread(target=worker) for _ in range(worker_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def _skip_clean_report(self, summary: ReportSummary) -> bool:
+        """Check whether an all-clean report should be skipped (send_when_clean=false)."""
+        if self._send_when_clean:
+            return False
+        if summary.hosts_with_updates or summary.hosts_with_errors:
+            return False
 
-        # Summary
-        html += self._generate_summary_html(reports)
+        logger.info("All hosts up to date, skipping report (send_when_clean=false)")
+        return True
 
-        # Individual host reports
-        html += "<h3>Individual Host Reports</h3>"
+    def _compose_update_report(
+        self,
+        reports: List[UpdateReport],
+        summary: ReportSummary,
+        now: datetime,
+        report_type: Optional[str] = None,
+    ) -> Tuple[str, str, str]:
+        """
+        Build the subject, HTML body and text body of an update report.
+
+        now is used for the "Generated on" lines and the report filename.
+        When report_type is given, the HTML body is also written to the
+        reports/ directory while it is generated.
+        """
+        sorted_reports = sorted(reports, key=_report_sort_key)
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        subject = self._generate_subject(summary)
+
+        report_file = self._open_html_report(report_type, now) if report_type else None
+        html_buffer = io.StringIO()
+        text_body = self._write_bodies(
+            sorted_reports,
+            summary,
+            timestamp,
+            html_buffer,
+            report_file,
+        )
+        html_body = html_buffer.getvalue()
+        return subject, html_body, text_body
+
+    def _save_check_report(
+        self, reports: List[UpdateReport], summary: ReportSummary, now: datetime
+    ) -> None:
+        """Write only the HTML check report to reports/, skipping the text body."""
+        report_file = self._open_html_report("check", now)
+        if report_file is None:
+            return
+
+        complete = False
+        try:
+            self._write_bodies(
+                sorted(reports, key=_report_sort_key),
+                summary,
+                now.strftime("%Y-%m-%d %H:%M:%S"),
+                report_file,
+                include_text=False,
+            )
+            complete = True
+        except OSError as e:
+            logger.error("Failed to save HTML report: %s", e)
+        finally:
+            self._close_html_report(report_file, complete)
+
+    def _summarize(self, reports: List[UpdateReport]) -> ReportSummary:
+        """Compute all summary counters in a single pass over the reports."""
+        hosts_with_updates = 0
+        hosts_with_errors = 0
+        security_hosts = []
+
+        for report in reports:
+            if report.error:
+                hosts_with_errors += 1
+            if not report.updates:
+                continue
+            hosts_with_updates += 1
+            security_count = len(report.security_updates)
+            if security_count:
+                security_hosts.append((report.host.name, security_count))
+
+        return ReportSummary(
+            total_hosts=len(reports),
+            hosts_with_updates=hosts_with_updates,
+            hosts_with_errors=hosts_with_errors,
+            security_hosts=security_hosts,
+        )
+
+    def _generate_subject(self, summary: ReportSummary) -> str:
+        """Generate email subject line."""
+        hosts_with_security = len(summary.security_hosts)
 
-        for report in sorted(
-            reports,
-            key=lambda r: (not r.has_security_updates, not r.has_updates, r.host.name),
-        ):
-            html += self._generate_host_html(report)
+        if hosts_with_security > 0:
+            return f"[SECURITY] System Updates Report: {hosts_with_security} hosts need security updates"
+        elif summary.hosts_with_updates > 0:
+            return f"System Updates Report: {summary.hosts_with_updates}/{summary.total_hosts} hosts have updates available"
+        else:
+            return f"System Updates Report: All {summary.total_hosts} hosts up to date"
 
-        html += """
-        </body>
-        </html>
+    def _write_bodies(
+        self,
+        reports: List[UpdateReport],
+        summary: ReportSummary,
+        timestamp: str,
+        out: TextIO,
+        report_file: Optional[TextIO] = None,
+        include_text: bool = True,
+    ) -> str:
         """
+        Render both email bodies in a single pass over reports already in display order.
 
-        return html
+        The HTML body is written to out (and mirrored to report_file, if given);
+        the plain text body is returned, or "" when include_text is False.
+        """
+        if report_file is not None:
+            out = _TeeWriter(out, report_file)
 
-    def _generate_summary_html(self, reports: List[UpdateReport]) -> str:
+        text_parts = (
+            self._generate_text_header(summary, timestamp) if include_text else []
+        )
+        try:
+            out.write(_CHECK_HTML_HEAD)
+            out.write(_CHECK_HEADER_HTML.format(timestamp=timestamp))
+            # Summary
+            out.write(self._generate_summary_html(summary))
+            # Individual host reports
+            out.write("<h3>Individual Host Reports</h3>")
+            for report in reports:
+                out.write(self._generate_host_html(report))
+                if include_text:
+                    self._append_host_text(text_parts, report)
+            out.write(_HTML_FOOTER)
+        finally:
+            if report_file is not None:
+                self._close_html_report(report_file, out.report_file is not None)
+
+        return "".join(text_parts)
+
+    def _generate_summary_html(self, summary: ReportSummary) -> str:
         """Generate summary section for HTML email."""
-        total_hosts = len(reports)
-        hosts_with_updates = [r for r in reports if r.has_updates]
-        hosts_with_security = [r for r in reports if r.has_security_updates]
-        hosts_with_errors = [r for r in reports if r.error]
+        hosts_with_security = summary.security_hosts
 
-        html = f"""
+        parts = [f"""
         <div class="summary">
             <h3>Summary</h3>
             <table>
                 <tr><th>Metric</th><th>Count</th></tr>
-                <tr><td>Total Hosts Checked</td><td>{total_hosts}</td></tr>
-                <tr><td>Hosts with Updates</td><td>{len(hosts_with_updates)}</td></tr>
+                <tr><td>Total Hosts Checked</td><td>{summary.total_hosts}</td></tr>
+                <tr><td>Hosts with Updates</td><td>{summary.hosts_with_updates}</td></tr>
                 <tr><td>Hosts with Security Updates</td><td style="{'background-color: #ffeeee;' if hosts_with_security else ''}">{len(hosts_with_security)}</td></tr>
-                <tr><td>Hosts with Errors</td><td>{len(hosts_with_errors)}</td></tr>
+                <tr><td>Hosts with Errors</td><td>{summary.hosts_with_errors}</td></tr>
             </table>
-        """
+        """]
 
         if hosts_with_security:
-            html += "<h4 style='color: red;'>Hosts Requiring Security Updates:</h4><ul>"
-            for report in hosts_with_security:
-                security_count = len(report.security_updates)
-                html += f"<li><strong>{report.host.name}</strong> - {security_count} security updates</li>"
-            html += "</ul>"
-
-        html += "</div>"
-        return html
+            parts.append(
+                "<h4 style='color: red;'>Hosts Requiring Security Updates:</h4><ul>"
+            )
+            parts.extend(
+                f"<li><strong>{_escape(host_name)}</strong> - {security_count} security updates</li>"
+                for host_name, security_count in hosts_with_security
+            )
+            parts.append("</ul>")
+
+        parts.append("</div>")
+        return "".join(parts)
+
+    def _generate_check_summary_page(
+        self, summary: ReportSummary, now: datetime, filename: str
+    ) -> str:
+        """Generate a summary-only HTML page pointing at the attached full report."""
+        return "".join(
+            (
+                _CHECK_HTML_HEAD,
+                _CHECK_HEADER_HTML.format(timestamp=now.strftime("%Y-%m-%d %H:%M:%S")),
+                self._generate_summary_html(summary),
+                _ATTACHED_REPORT_HTML.format(filename=_escape(filename)),
+                _HTML_FOOTER,
+            )
+        )
 
     def _generate_host_html(self, report: UpdateReport) -> str:
         """Generate HTML for a single host report."""
@@ -216,230 +772,411 @@ class EmailSender:
         elif not report.has_updates:
             css_class += " no-updates"
 
-        html = f'<div class="{css_class}">'
-        html += (
-            f'<div class="host-name">{report.host.name} ({report.host.hostname})</div>'
-        )
-
-        if report.os_info:
-            html += f'<div class="os-info">{report.os_info}</div>'
-
+        # Host, OS, error and package strings come from remote systems and
+        # must not be interpreted as markup
         if report.error:
-            html += f'<div style="color: red;">Error: {report.error}</div>'
+            body = _HOST_ERROR_HTML.format(error=_escape(report.error))
             # Show command output if available (for failed package updates)
             if report.command_output:
-                html += f'<div><strong>Command Output:</strong><pre style="white-space: pre-wrap; font-size: 12px; max-height: 300px; overflow-y: auto; background-color: #f8f8f8; padding: 8px; border-radius: 3px;">{report.command_output}</pre></div>'
+                body += _HOST_COMMAND_OUTPUT_HTML.format(
+                    output=_escape(report.command_output)
+                )
         elif not report.has_updates:
-            html += '<div style="color: green;">✓ No updates available</div>'
+            body = _HOST_NO_UPDATES_HTML
         else:
+            sections = []
             if report.has_security_updates:
-                html += f'<div><strong style="color: red;">Security Updates ({len(report.security_updates)}):</strong></div>'
-                html += '<div class="updates-list">'
-                for update in report.security_updates:
-                    html += (
-                        f'<div class="update-item security-update">🔒 {update}</div>'
+                sections.append(
+                    _SECURITY_UPDATES_HTML.format(
+                        count=len(report.security_updates),
+                        rows="".join(
+                            _SECURITY_UPDATE_HTML.format(update=_escape(str(update)))
+                            for update in report.security_updates
+                        ),
                     )
-                html += "</div>"
-
+                )
             if report.regular_updates:
-                html += f"<div><strong>Regular Updates ({len(report.regular_updates)}):</strong></div>"
-                html += '<div class="updates-list">'
-                for update in report.regular_updates:
-                    html += f'<div class="update-item">{update}</div>'
-                html += "</div>"
-
-        html += "</div>"
-        return html
+                sections.append(
+                    _REGULAR_UPDATES_HTML.format(
+                        count=len(report.regular_updates),
+                        rows="".join(
+                            _REGULAR_UPDATE_HTML.format(update=_escape(str(update)))
+                            for update in report.regular_updates
+                        ),
+                    )
+                )
+            body = "".join(sections)
+
+        return _HOST_HTML.format_map(
+            {
+                "css_class": css_class,
+                "name": _escape(report.host.name),
+                "hostname": _escape(report.host.hostname),
+                "os_block": (
+                    _HOST_OS_HTML.format(os_info=_escape(str(report.os_info)))
+                    if report.os_info
+                    else ""
+                ),
+                "body": body,
+            }
+        )
 
-    def _generate_text_body(self, reports: List[UpdateReport]) -> str:
-        """Generate plain text email body."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def _generate_text_header(
+        self, summary: ReportSummary, timestamp: str
+    ) -> List[str]:
+        """Generate the plain text body up to the individual host reports."""
+        # Summary
+        hosts_with_security = summary.security_hosts
 
-        text = f"""System Updates Report
+        parts = [
+            f"""System Updates Report
 Generated on: {timestamp}
 
-"""
-
-        # Summary
-        total_hosts = len(reports)
-        hosts_with_updates = [r for r in reports if r.has_updates]
-        hosts_with_security = [r for r in reports if r.has_security_updates]
-        hosts_with_errors = [r for r in reports if r.error]
-
-        text += f"""SUMMARY:
-Total Hosts Checked: {total_hosts}
-Hosts with Updates: {len(hosts_with_updates)}
+""",
+            f"""SUMMARY:
+Total Hosts Checked: {summary.total_hosts}
+Hosts with Updates: {summary.hosts_with_updates}
 Hosts with Security Updates: {len(hosts_with_security)}
-Hosts with Errors: {len(hosts_with_errors)}
+Hosts with Errors: {summary.hosts_with_errors}
 
-"""
+""",
+        ]
 
         if hosts_with_security:
-            text += "HOSTS REQUIRING SECURITY UPDATES:\n"
-            for report in hosts_with_security:
-                security_count = len(report.security_updates)
-                text += f"- {report.host.name}: {security_count} security updates\n"
-            text += "\n"
+            parts.append("HOSTS REQUIRING SECURITY UPDATES:\n")
+            parts.extend(
+                f"- {host_name}: {security_count} security updates\n"
+                for host_name, security_count in hosts_with_security
+            )
+            parts.append("\n")
 
         # Individual host reports
-        text += "INDIVIDUAL HOST REPORTS:\n"
-        text += "=" * 50 + "\n\n"
+        parts.extend(("INDIVIDUAL HOST REPORTS:\n", _SEP_EQ50, "\n"))
+        return parts
 
-        for report in sorted(
-            reports,
-            key=lambda r: (not r.has_security_updates, not r.has_updates, r.host.name),
-        ):
-            text += f"Host: {report.host.name} ({report.host.hostname})\n"
+    def _append_host_text(self, parts: List[str], report: UpdateReport) -> None:
+        """Append the plain text section for a single host report to parts."""
+        parts.append(f"Host: {report.host.name} ({report.host.hostname})\n")
 
-            if report.os_info:
-                text += f"OS: {report.os_info}\n"
+        if report.os_info:
+            parts.append(f"OS: {report.os_info}\n")
 
-            if report.error:
-                text += f"ERROR: {report.error}\n"
-                # Show command output if available (for failed package updates)
-                if report.command_output:
-                    text += f"Command Output:\n"
-                    for line in report.command_output.split("\n"):
-                        text += f"  {line}\n"
-            elif not report.has_updates:
-                text += "Status: No updates available\n"
-            else:
-                if report.has_security_updates:
-                    text += f"SECURITY UPDATES ({len(report.security_updates)}):\n"
-                    for update in report.security_updates:
-                        text += f"  [SECURITY] {update}\n"
+        if report.error:
+            parts.append(f"ERROR: {report.error}\n")
+            # Show command output if available (for failed package updates)
+            if report.command_output:
+                output = report.command_output
+                if not output.endswith("\n"):
+                    output += "\n"
+                parts.extend(("Command Output:\n", textwrap.indent(output, "  ")))
+        elif not report.has_updates:
+            parts.append("Status: No updates available\n")
+        else:
+            if report.has_security_updates:
+                parts.append(f"SECURITY UPDATES ({len(report.security_updates)}):\n")
+                parts.extend(
+                    (
+                        "  [SECURITY] ",
+                        "\n  [SECURITY] ".join(map(str, report.security_updates)),
+                        "\n",
+                    )
+                )
 
-                if report.regular_updates:
-                    text += f"Regular Updates ({len(report.regular_updates)}):\n"
-                    for update in report.regular_updates:
-                        text += f"  {update}\n"
+            if report.regular_updates:
+                parts.append(f"Regular Updates ({len(report.regular_updates)}):\n")
+                parts.extend(
+                    ("  ", "\n  ".join(map(str, report.regular_updates)), "\n")
+                )
 
-            text += "\n" + "-" * 50 + "\n\n"
+        parts.extend(("\n", _SEP_DASH50, "\n"))
 
-        return text
+    def _build_message(
+        self,
+        subject: str,
+        text_body: str,
+        html_body: str,
+        attachment_name: str,
+        summary_page: Callable[[str], str],
+        to_header: Optional[str] = None,
+    ) -> EmailMessage:
+        """
+        Build a report message with text and HTML alternatives.
 
-    def _save_html_report(self, html_body: str, report_type: str = "check") -> None:
-        """Save HTML report to reports/ directory with datestamp."""
+        Args:
+            subject: Message subject
+            text_body: Plain text version of the report
+            html_body: HTML version of the report
+            attachment_name: Filename used if the HTML body must be attached
+            summary_page: Builds the inline HTML shown when it is attached
+            to_header: To header value (defaults to all configured recipients)
+
+        Returns:
+            The composed EmailMessage
+        """
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self._from_email
+        msg["To"] = to_header if to_header is not None else self._to_header
+
+        # Text and HTML versions as multipart/alternative; quoted-printable
+        # keeps the body 7-bit clean for servers without 8BITMIME
+        msg.set_content(text_body, cte="quoted-printable")
+        self._add_html_body(msg, html_body, attachment_name, summary_page)
+        return msg
+
+    def _add_html_body(
+        self,
+        msg: EmailMessage,
+        html_body: str,
+        filename: str,
+        summary_page: Callable[[str], str],
+    ) -> None:
+        """
+        Add the HTML alternative to msg, attaching oversized bodies gzipped.
+
+        Bodies over html_attachment_threshold bytes are sent as a gzipped
+        attachment named filename, with summary_page(filename) shown inline.
+        """
+        data = html_body.encode("utf-8")
+        threshold = self._html_attachment_threshold
+        if not threshold or len(data) <= threshold:
+            msg.add_alternative(html_body, subtype="html", cte="quoted-printable")
+            return
+
+        logger.info(
+            "HTML report is %d bytes, attaching it compressed as %s",
+            len(data),
+            filename,
+        )
+        msg.add_alternative(
+            summary_page(filename), subtype="html", cte="quoted-printable"
+        )
+        msg.add_attachment(
+            gzip.compress(data, compresslevel=6),
+            maintype="application",
+            subtype="gzip",
+            filename=filename,
+        )
+
+    def _html_report_path(self, report_type: str, now: datetime) -> Path:
+        """Create reports/ if needed and return a report path datestamped with now."""
+        reports_dir = Path("reports")
+        reports_dir.mkdir(exist_ok=True)
+
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        return reports_dir / f"{report_type}_report_{timestamp}.html"
+
+    def _open_html_report(self, report_type: str, now: datetime) -> Optional[TextIO]:
+        """Open a new HTML report file for streaming, or None if that fails."""
+        try:
+            return open(
+                self._html_report_path(report_type, now),
+                "w",
+                encoding="utf-8",
+                buffering=_REPORT_WRITE_BUFFER,
+            )
+        except OSError as e:
+            logger.error("Failed to save HTML report: %s", e)
+            return None
+
+    def _close_html_report(self, report_file: TextIO, complete: bool) -> None:
+        """Close a streamed HTML report file and log the outcome."""
         try:
-            # Create reports directory if it doesn't exist
-            reports_dir = Path("reports")
-            reports_dir.mkdir(exist_ok=True)
+            report_file.close()
+        except OSError as e:
+            logger.error("Failed to save HTML report: %s", e)
+            return
 
-            # Generate filename with datestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{report_type}_report_{timestamp}.html"
-            filepath = reports_dir / filename
+        if complete:
+            logger.info("HTML report saved to %s", report_file.name)
+
+    def _save_html_report(
+        self, html_body: str, report_type: str, now: datetime
+    ) -> None:
+        """Save HTML report to reports/ directory with datestamp."""
+        try:
+            filepath = self._html_report_path(report_type, now)
 
-            # Write HTML report to file
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(html_body)
+            # Encode once and hand the bytes over in large chunks
+            with open(filepath, "wb", buffering=_REPORT_WRITE_BUFFER) as f:
+                f.write(html_body.encode("utf-8"))
 
-            logger.info(f"HTML report saved to {filepath}")
+            logger.info("HTML report saved to %s", filepath)
 
         except Exception as e:
-            logger.error(f"Failed to save HTML report: {e}")
+            logger.error("Failed to save HTML report: %s", e)
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a new SMTP connection."""
+        logger.debug(
+            "Initiating SMTP connection to %s:%s", self._smtp_server, self._smtp_port
+        )
+        logger.debug("TLS enabled: %s", self._use_tls)
+
+        if self._use_tls:
+            logger.debug("Creating SMTP connection with TLS")
+            server = smtplib.SMTP(self._smtp_server, self._smtp_port)
+            # Explicitly call EHLO before starting TLS for better compatibility
+            server.ehlo()
+            logger.debug("Starting TLS encryption")
+            server.starttls()
+            # EHLO again after TLS as required by RFC
+            server.ehlo()
+        else:
+            logger.debug("Creating SMTP connection without TLS")
+            server = smtplib.SMTP(self._smtp_server, self._smtp_port)
+            # Call EHLO for proper SMTP handshake
+            server.ehlo()
+
+        logger.debug("SMTP connection established")
+
+        # Authenticate if credentials provided
+        if self._username is not None and self._password is not None:
+            logger.debug("Authenticating as user: %s", self._username)
+            server.login(self._username, self._password)
+            logger.debug("SMTP authentication successful")
+        else:
+            logger.debug("No SMTP authentication credentials provided")
+
+        return server
+
+    def _get_server(self) -> smtplib.SMTP:
+        """Return the open SMTP session if it is still alive, else reconnect."""
+        if self._server is not None:
+            # A session kept open inside a with-block may have been dropped
+            # by the server's idle timeout; probe it before reuse
+            try:
+                code, _ = self._server.noop()
+                if code == 250:
+                    return self._server
+            except (smtplib.SMTPServerDisconnected, OSError):
+                pass
+            logger.debug("SMTP session no longer usable, reconnecting")
+            self.close()
+
+        self._server = self._connect()
+        return self._server
+
+    def _send_with_retry(
+        self, msg: EmailMessage, to_emails: List[str], attempts: int
+    ) -> None:
+        """Send over the current session, retrying transient 4xx replies with backoff."""
+        delay = _RETRY_INITIAL_DELAY
+        for attempt in range(1, attempts + 1):
+            try:
+                # Connecting is retried too: servers often greet with 421
+                # when busy (SMTPConnectError)
+                server = self._get_server()
+                # send_message flattens straight to bytes with CRLF line endings,
+                # as required by RFC 5321 and strict SMTP servers like maddy
+                server.send_message(msg, self._from_email, to_emails)
+                return
+            except (
+                smtplib.SMTPResponseException,
+                smtplib.SMTPRecipientsRefused,
+            ) as e:
+                smtp_code = _transient_smtp_code(e)
+                if smtp_code is None or attempt == attempts:
+                    raise
+                logger.warning(
+                    "SMTP server deferred message (%s), "
+                    "retrying in %.0fs (attempt %s/%s)",
+                    smtp_code,
+                    delay,
+                    attempt,
+                    attempts,
+                )
+                time.sleep(delay)
+                delay *= 2
+
+    def send_message(
+        self, msg: EmailMessage, to_emails: List[str], attempts: int = 1
+    ) -> bool:
+        """
+        Send a prepared message, retrying transient SMTP replies.
 
-    def _send_email(self, msg: MIMEMultipart, to_emails: List[str]) -> bool:
+        Args:
+            msg: Message to send
+            to_emails: Envelope recipients
+            attempts: Total send attempts for transient 421/450/454 replies
+
+        Returns:
+            True if the message was sent, False otherwise
+        """
+        return self._send_email(msg, to_emails, attempts)
+
+    def _send_email(
+        self, msg: EmailMessage, to_emails: List[str], attempts: int = 1
+    ) -> bool:
         """Send the email message via SMTP."""
+        sent = False
         try:
             # Validate email configuration for strict SMTP servers like maddy
-            from_email = self.smtp_config["from_email"]
+            from_email = self._from_email
             if not from_email or "@" not in from_email:
-                logger.error(f"Invalid from_email format: {from_email}")
+                logger.error("Invalid from_email format: %s", from_email)
                 logger.debug(
                     "from_email must be a valid email address for SMTP compliance"
                 )
                 return False
 
-            logger.debug(
-                f"Initiating SMTP connection to {self.smtp_config['smtp_server']}:{self.smtp_config['smtp_port']}"
-            )
-            logger.debug(f"TLS enabled: {self.smtp_config.get('use_tls', True)}")
-            logger.debug(f"Recipients: {', '.join(to_emails)}")
-            logger.debug(f"From: {from_email}")
-
-            # Create SMTP connection
-            if self.smtp_config.get("use_tls", True):
-                logger.debug("Creating SMTP connection with TLS")
-                server = smtplib.SMTP(
-                    self.smtp_config["smtp_server"], self.smtp_config["smtp_port"]
-                )
-                # Explicitly call EHLO before starting TLS for better compatibility
-                server.ehlo()
-                logger.debug("Starting TLS encryption")
-                server.starttls()
-                # EHLO again after TLS as required by RFC
-                server.ehlo()
-            else:
-                logger.debug("Creating SMTP connection without TLS")
-                server = smtplib.SMTP(
-                    self.smtp_config["smtp_server"], self.smtp_config["smtp_port"]
-                )
-                # Call EHLO for proper SMTP handshake
-                server.ehlo()
-
-            logger.debug("SMTP connection established")
-
-            # Authenticate if credentials provided
-            if "username" in self.smtp_config and "password" in self.smtp_config:
-                logger.debug(f"Authenticating as user: {self.smtp_config['username']}")
-                server.login(self.smtp_config["username"], self.smtp_config["password"])
-                logger.debug("SMTP authentication successful")
-            else:
-                logger.debug("No SMTP authentication credentials provided")
+            logger.debug("Recipients: %s", ", ".join(to_emails))
+            logger.debug("From: %s", from_email)
 
             # Send email
             logger.debug("Sending email message...")
-            # Use SMTP policy to ensure proper CRLF line endings for SMTP compliance
-            # This is required by RFC 5321 and strict SMTP servers like maddy
-            text = msg.as_string(policy=SMTP)
-            logger.debug(f"Email message size: {len(text)} bytes")
-            # Log first few lines of message for debugging (without sensitive content)
-            first_lines = "\n".join(text.split("\n")[:5])
-            logger.debug(f"Message headers: {repr(first_lines[:200])}")
-            server.sendmail(self.smtp_config["from_email"], to_emails, text)
-            server.quit()
-            logger.debug("SMTP connection closed")
-
-            logger.info(f"Update report sent to {', '.join(to_emails)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                # Serializing the message is only worth it when it gets logged;
+                # as_bytes gives the real wire size
+                data = msg.as_bytes(policy=SMTP)
+                logger.debug("Email message size: %d bytes", len(data))
+                # Log first few lines of message for debugging (without sensitive content)
+                head = data[:200].decode("ascii", "replace")
+                first_lines = "\n".join(head.split("\n")[:5])
+                logger.debug("Message headers: %r", first_lines)
+            self._send_with_retry(msg, to_emails, attempts)
+            sent = True
+
+            logger.info("Update report sent to %s", ", ".join(to_emails))
             return True
 
         except smtplib.SMTPAuthenticationError as e:
-            logger.error(f"SMTP Authentication failed: {e}")
-            logger.debug(
-                f"Check username/password for {self.smtp_config.get('username', 'N/A')}"
-            )
+            logger.error("SMTP Authentication failed: %s", e)
+            logger.debug("Check username/password for %s", self._username or "N/A")
             return False
         except smtplib.SMTPConnectError as e:
-            logger.error(f"Failed to connect to SMTP server: {e}")
-            logger.debug(
-                f"Server: {self.smtp_config['smtp_server']}:{self.smtp_config['smtp_port']}"
-            )
+            logger.error("Failed to connect to SMTP server: %s", e)
+            logger.debug("Server: %s:%s", self._smtp_server, self._smtp_port)
             return False
         except smtplib.SMTPRecipientsRefused as e:
-            logger.error(f"Recipients refused by SMTP server: {e}")
-            logger.debug(f"Rejected recipients: {e.recipients}")
+            logger.error("Recipients refused by SMTP server: %s", e)
+            logger.debug("Rejected recipients: %s", e.recipients)
             return False
         except smtplib.SMTPDataError as e:
-            logger.error(f"SMTP data error: {e}")
-            logger.debug(f"This may indicate message format issues or server rejection")
+            logger.error("SMTP data error: %s", e)
+            logger.debug("This may indicate message format issues or server rejection")
             return False
         except smtplib.SMTPServerDisconnected as e:
-            logger.error(f"SMTP server disconnected unexpectedly: {e}")
+            logger.error("SMTP server disconnected unexpectedly: %s", e)
             logger.debug(
-                f"This may indicate server-side connection issues or policy violations"
+                "This may indicate server-side connection issues or policy violations"
             )
             return False
         except ConnectionResetError as e:
-            logger.error(f"Connection reset by SMTP server: {e}")
+            logger.error("Connection reset by SMTP server: %s", e)
             logger.debug(
-                f"Server may have rejected the connection due to policy violations"
+                "Server may have rejected the connection due to policy violations"
             )
             return False
-        except Exception as e:
-            logger.error(f"Failed to send email via SMTP: {e}")
-            logger.debug(f"Error type: {type(e).__name__}")
+        except (smtplib.SMTPException, OSError) as e:
+            logger.error("Failed to send email via SMTP: %s", e)
+            logger.debug("Error type: %s", type(e).__name__)
             return False
+        finally:
+            # Drop the connection after one-shot sends, and after any failure
+            # so the next send starts from a fresh session
+            if not (self._persistent and sent):
+                self.close()
 
     def send_automated_update_report(self, reports, unmapped_hosts=None) -> bool:
         """
@@ -453,219 +1190,196 @@ Hosts with Errors: {len(hosts_with_errors)}
             True if email sent successfully, False otherwise
         """
         try:
-            # Import here to avoid circular imports
-            from .update_automator import UpdateResult
-
-            # Generate email content
-            subject = self._generate_automated_subject(reports)
-            html_body = self._generate_automated_html_body(reports, unmapped_hosts)
-            text_body = self._generate_automated_text_body(reports, unmapped_hosts)
+            # Generate email content; one instant for the bodies and the filename
+            now = datetime.now()
+            timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+            buckets = self._bucketize(reports)
+            subject = self._generate_automated_subject(buckets)
+            html_body = self._generate_automated_html_body(
+                buckets, timestamp, unmapped_hosts
+            )
+            text_body = self._generate_automated_text_body(
+                buckets, timestamp, unmapped_hosts
+            )
 
             # Save HTML report to reports/ directory with datestamp
-            self._save_html_report(html_body, "automated_update")
+            self._save_html_report(html_body, "automated_update", now)
 
             # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = self.smtp_config["from_email"]
-
-            # Handle multiple recipients
-            to_emails = self.smtp_config["to_email"]
-            if isinstance(to_emails, str):
-                to_emails = [to_emails]
-            msg["To"] = ", ".join(to_emails)
-
-            # Attach text and HTML versions
-            text_part = MIMEText(text_body, "plain", "utf-8")
-            html_part = MIMEText(html_body, "html", "utf-8")
-            msg.attach(text_part)
-            msg.attach(html_part)
+            msg = self._build_message(
+                subject,
+                text_body,
+                html_body,
+                f"automated_update_report_{now:%Y%m%d_%H%M%S}.html.gz",
+                lambda filename: self._generate_automated_summary_page(
+                    buckets, timestamp, filename
+                ),
+            )
 
             # Send email
-            return self._send_email(msg, to_emails)
+            return self._send_email(msg, self._to_emails)
 
         except Exception as e:
-            logger.error(f"Failed to generate automated update email: {e}")
+            logger.error("Failed to generate automated update email: %s", e)
             return False
 
-    def _generate_automated_subject(self, reports) -> str:
+    def _bucketize(self, reports) -> ResultBuckets:
+        """Group automated reports by result and total applied updates in one pass."""
+        by_result = defaultdict(list)
+        updates_applied = 0
+        security_updates_applied = 0
+
+        for report in reports:
+            by_result[report.result].append(report)
+            if report.result == UpdateResult.SUCCESS:
+                updates_applied += len(report.update_report.updates)
+                security_updates_applied += len(report.update_report.security_updates)
+
+        return ResultBuckets(
+            total_hosts=len(reports),
+            by_result=by_result,
+            updates_applied=updates_applied,
+            security_updates_applied=security_updates_applied,
+        )
+
+    def _result_counts(self, buckets: ResultBuckets) -> ResultCounts:
+        """Derive per-outcome host counts from bucketized reports."""
+        by_result = buckets.by_result
+        successful = len(by_result[UpdateResult.SUCCESS])
+        no_updates = len(by_result[UpdateResult.NO_UPDATES])
+        opt_out = len(by_result[UpdateResult.OPT_OUT])
+        critical = len(by_result[UpdateResult.REVERT_FAILED])
+        reverted = len(by_result[UpdateResult.REVERTED])
+        failed = (
+            buckets.total_hosts
+            - successful
+            - no_updates
+            - opt_out
+            - critical
+            - reverted
+        )
+
+        return ResultCounts(
+            successful=successful,
+            no_updates=no_updates,
+            opt_out=opt_out,
+            critical=critical,
+            reverted=reverted,
+            failed=failed,
+        )
+
+    def _generate_automated_subject(self, buckets: ResultBuckets) -> str:
         """Generate email subject for automated updates."""
-        from .update_automator import UpdateResult
-
-        total = len(reports)
-        successful = sum(1 for r in reports if r.result == UpdateResult.SUCCESS)
-        no_updates = sum(1 for r in reports if r.result == UpdateResult.NO_UPDATES)
-        opt_out = sum(1 for r in reports if r.result == UpdateResult.OPT_OUT)
-        critical = sum(1 for r in reports if r.result == UpdateResult.REVERT_FAILED)
-        reverted = sum(1 for r in reports if r.result == UpdateResult.REVERTED)
-        failed = total - successful - no_updates - opt_out - critical - reverted
-
-        if critical > 0:
-            return f"🚨 URGENT: {critical} host(s) failed update+revert, {failed} other failures - miniupdate"
-        elif failed > 0 or reverted > 0:
-            return f"⚠️ Update Issues: {failed} failed, {reverted} reverted, {successful} success - miniupdate"
-        elif successful > 0:
-            if opt_out > 0:
-                return f"✅ Updates Applied: {successful} updated, {opt_out} opt-out, {no_updates} up-to-date - miniupdate"
-            else:
-                return f"✅ Updates Applied: {successful} updated, {no_updates} up-to-date - miniupdate"
-        elif opt_out > 0:
-            return f"📋 Check Complete: {opt_out} opt-out (manual updates needed), {no_updates} up-to-date - miniupdate"
-        else:
-            return f"📋 No Updates Needed: {no_updates} hosts checked - miniupdate"
+        counts = self._result_counts(buckets)
+
+        template = next(
+            (
+                template
+                for matches, template in _AUTOMATED_SUBJECT_RULES
+                if matches(counts)
+            ),
+            _AUTOMATED_SUBJECT_DEFAULT,
+        )
+        return template.format_map(counts._asdict())
 
-    def _generate_automated_html_body(self, reports, unmapped_hosts=None) -> str:
+    def _generate_automated_html_body(
+        self, buckets: ResultBuckets, timestamp: str, unmapped_hosts=None
+    ) -> str:
         """Generate HTML email body for automated updates."""
-        from .update_automator import UpdateResult
-
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
-                .container { max-width: 800px; margin: 0 auto; background-color: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
-                .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; margin: -20px -20px 20px -20px; border-radius: 8px 8px 0 0; }
-                .summary { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; border-left: 4px solid #007bff; }
-                .host { margin: 15px 0; padding: 15px; border-radius: 5px; border-left: 4px solid #28a745; }
-                .host.critical { border-left-color: #dc3545; background-color: #fff5f5; }
-                .host.reverted { border-left-color: #ffc107; background-color: #fffbf0; }
-                .host.failed { border-left-color: #fd7e14; background-color: #fff8f0; }
-                .host.success { border-left-color: #28a745; background-color: #f8fff8; }
-                .host.no-updates { border-left-color: #6c757d; background-color: #f8f9fa; }
-                .host-name { font-weight: bold; font-size: 16px; margin-bottom: 5px; }
-                .host-details { color: #666; font-size: 14px; margin-bottom: 10px; }
-                .status { font-weight: bold; padding: 4px 8px; border-radius: 3px; display: inline-block; }
-                .status.success { background-color: #d4edda; color: #155724; }
-                .status.critical { background-color: #f8d7da; color: #721c24; }
-                .status.reverted { background-color: #fff3cd; color: #856404; }
-                .status.failed { background-color: #fdecea; color: #b52d3a; }
-                .updates-list { margin-top: 10px; }
-                .update-item { background-color: #e9ecef; padding: 5px 8px; margin: 2px 0; border-radius: 3px; }
-                .security-update { background-color: #f8d7da; color: #721c24; font-weight: bold; }
-                .error-details { background-color: #f8d7da; color: #721c24; padding: 8px; border-radius: 3px; margin-top: 5px; }
-                .timing { color: #666; font-size: 12px; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-        """
-
-        html += self._generate_automated_header_html()
-        html += self._generate_automated_summary_html(reports)
+        parts = [
+            _AUTOMATED_HTML_HEAD,
+            self._generate_automated_header_html(timestamp),
+            self._generate_automated_summary_html(buckets),
+        ]
 
         # Show unmapped hosts warning first if there are any
         if unmapped_hosts:
-            html += self._generate_unmapped_hosts_html(unmapped_hosts)
+            parts.append(self._generate_unmapped_hosts_html(unmapped_hosts))
 
         # Group hosts by result type for better organization
-        critical_hosts = [r for r in reports if r.result == UpdateResult.REVERT_FAILED]
-        reverted_hosts = [r for r in reports if r.result == UpdateResult.REVERTED]
-        failed_hosts = [
-            r
-            for r in reports
-            if r.result
-            in [
-                UpdateResult.FAILED_UPDATES,
-                UpdateResult.FAILED_REBOOT,
-                UpdateResult.FAILED_AVAILABILITY,
-                UpdateResult.FAILED_SNAPSHOT,
-            ]
-        ]
-        successful_hosts = [r for r in reports if r.result == UpdateResult.SUCCESS]
-        opt_out_hosts = [r for r in reports if r.result == UpdateResult.OPT_OUT]
-        no_update_hosts = [r for r in reports if r.result == UpdateResult.NO_UPDATES]
+        by_result = buckets.by_result
+        critical_hosts = by_result[UpdateResult.REVERT_FAILED]
+        reverted_hosts = by_result[UpdateResult.REVERTED]
+        failed_hosts = _failed_hosts(by_result)
+        successful_hosts = by_result[UpdateResult.SUCCESS]
+        opt_out_hosts = by_result[UpdateResult.OPT_OUT]
+        no_update_hosts = by_result[UpdateResult.NO_UPDATES]
 
         # Show critical failures first
         if critical_hosts:
-            html += (
+            parts.append(
                 '<h2 style="color: #dc3545;">🚨 CRITICAL FAILURES (Revert Failed)</h2>'
             )
-            for report in critical_hosts:
-                html += self._generate_automated_host_html(report)
+            parts.extend(map(self._generate_automated_host_html, critical_hosts))
 
         # Then reverted hosts
         if reverted_hosts:
-            html += '<h2 style="color: #ffc107;">⚠️ Reverted Hosts</h2>'
-            for report in reverted_hosts:
-                html += self._generate_automated_host_html(report)
+            parts.append('<h2 style="color: #ffc107;">⚠️ Reverted Hosts</h2>')
+            parts.extend(map(self._generate_automated_host_html, reverted_hosts))
 
         # Then other failures
         if failed_hosts:
-            html += '<h2 style="color: #fd7e14;">❌ Failed Updates</h2>'
-            for report in failed_hosts:
-                html += self._generate_automated_host_html(report)
+            parts.append('<h2 style="color: #fd7e14;">❌ Failed Updates</h2>')
+            parts.extend(map(self._generate_automated_host_html, failed_hosts))
 
         # Then opt-out hosts (check-only)
         if opt_out_hosts:
-            html += '<h2 style="color: #ff9800;">⚠️ Opt-out Hosts (Check Only)</h2>'
-            for report in opt_out_hosts:
-                html += self._generate_automated_host_html(report)
+            parts.append(
+                '<h2 style="color: #ff9800;">⚠️ Opt-out Hosts (Check Only)</h2>'
+            )
+            parts.extend(map(self._generate_automated_host_html, opt_out_hosts))
 
         # Finally successful hosts and no-update hosts
         if successful_hosts:
-            html += '<h2 style="color: #28a745;">✅ Successfully Updated</h2>'
-            for report in successful_hosts:
-                html += self._generate_automated_host_html(report)
+            parts.append('<h2 style="color: #28a745;">✅ Successfully Updated</h2>')
+            parts.extend(map(self._generate_automated_host_html, successful_hosts))
 
         if no_update_hosts:
-            html += '<h2 style="color: #6c757d;">📋 No Updates Needed</h2>'
-            for report in no_update_hosts:
-                html += self._generate_automated_host_html(report)
-
-        html += """
-            </div>
-        </body>
-        </html>
-        """
-
-        return html
+            parts.append('<h2 style="color: #6c757d;">📋 No Updates Needed</h2>')
+            parts.extend(map(self._generate_automated_host_html, no_update_hosts))
+
+        parts.append(_AUTOMATED_HTML_FOOTER)
+
+        return "".join(parts)
+
+    def _generate_automated_summary_page(
+        self, buckets: ResultBuckets, timestamp: str, filename: str
+    ) -> str:
+        """Generate a summary-only automated HTML page pointing at the attached full report."""
+        return "".join(
+            (
+                _AUTOMATED_HTML_HEAD,
+                self._generate_automated_header_html(timestamp),
+                self._generate_automated_summary_html(buckets),
+                _ATTACHED_REPORT_HTML.format(filename=_escape(filename)),
+                _AUTOMATED_HTML_FOOTER,
+            )
+        )
 
-    def _generate_automated_header_html(self) -> str:
+    def _generate_automated_header_html(self, timestamp: str) -> str:
         """Generate header HTML for automated updates."""
         return f"""
             <div class="header">
                 <h1>🤖 Automated System Updates Report</h1>
-                <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p>Generated on {timestamp}</p>
             </div>
         """
 
-    def _generate_automated_summary_html(self, reports) -> str:
+    def _generate_automated_summary_html(self, buckets: ResultBuckets) -> str:
         """Generate summary HTML for automated updates."""
-        from .update_automator import UpdateResult
-
-        total = len(reports)
-        successful_updates = sum(1 for r in reports if r.result == UpdateResult.SUCCESS)
-        no_updates_needed = sum(
-            1 for r in reports if r.result == UpdateResult.NO_UPDATES
-        )
-        opt_out_hosts = sum(1 for r in reports if r.result == UpdateResult.OPT_OUT)
-        critical_failures = sum(
-            1 for r in reports if r.result == UpdateResult.REVERT_FAILED
-        )
-        reverted_hosts = sum(1 for r in reports if r.result == UpdateResult.REVERTED)
-        other_failures = (
-            total
-            - successful_updates
-            - no_updates_needed
-            - opt_out_hosts
-            - critical_failures
-            - reverted_hosts
-        )
-
-        total_updates_applied = sum(
-            len(r.update_report.updates)
-            for r in reports
-            if r.result == UpdateResult.SUCCESS
-        )
-        total_security_updates = sum(
-            len(r.update_report.security_updates)
-            for r in reports
-            if r.result == UpdateResult.SUCCESS
-        )
-
-        html = f"""
+        counts = self._result_counts(buckets)
+        total = buckets.total_hosts
+        successful_updates = counts.successful
+        no_updates_needed = counts.no_updates
+        opt_out_hosts = counts.opt_out
+        critical_failures = counts.critical
+        reverted_hosts = counts.reverted
+        other_failures = counts.failed
+
+        total_updates_applied = buckets.updates_applied
+        total_security_updates = buckets.security_updates_applied
+
+        parts = [f"""
         <div class="summary">
             <h2>📊 Summary</h2>
             <ul>
@@ -675,351 +1389,289 @@ Hosts with Errors: {len(hosts_with_errors)}
                 <li><strong>⚠️ Opt-out hosts (check-only):</strong> {opt_out_hosts}</li>
                 <li><strong>🔄 Reverted to snapshot:</strong> {reverted_hosts}</li>
                 <li><strong>❌ Other failures:</strong> {other_failures}</li>
-        """
+        """]
 
         if critical_failures > 0:
-            html += f'<li><strong style="color: #dc3545;">🚨 CRITICAL: Revert failures:</strong> {critical_failures}</li>'
+            parts.append(
+                f'<li><strong style="color: #dc3545;">🚨 CRITICAL: Revert failures:</strong> {critical_failures}</li>'
+            )
 
         if successful_updates > 0:
-            html += f"""
+            parts.append(f"""
                 <li><strong>Total updates applied:</strong> {total_updates_applied}</li>
                 <li><strong>Security updates applied:</strong> {total_security_updates}</li>
-            """
+            """)
 
-        html += """
+        parts.append("""
             </ul>
         </div>
-        """
+        """)
 
-        return html
+        return "".join(parts)
 
     def _generate_unmapped_hosts_html(self, unmapped_hosts) -> str:
         """Generate HTML error block for unmapped inventory hosts."""
-        html = """
-        <div class="summary" style="background-color: #f8d7da; border: 1px solid #f5c6cb; color: #721c24; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <h2 style="color: #721c24;">🚨 Configuration Warning: Unmapped Inventory Hosts</h2>
-            <p><strong>The following hosts are not configured in either the VM mapping file or the opt-out list:</strong></p>
-            <ul>
-        """
-
-        for host in unmapped_hosts:
-            html += f"<li><strong>{host.name}</strong> ({host.hostname})</li>"
-
-        html += """
-            </ul>
-            <p><strong>Action Required:</strong></p>
-            <ul>
-                <li>Add these hosts to your <code>vm_mapping.toml</code> file if they should receive automated updates, OR</li>
-                <li>Add them to the <code>opt_out_hosts</code> list in <code>config.toml</code> if they should only be checked (no automated updates)</li>
-            </ul>
-            <p><em>Without proper configuration, these hosts may not behave as expected during automated updates.</em></p>
-        </div>
-        """
+        parts = [_UNMAPPED_HOSTS_HTML_HEAD]
+        parts.extend(
+            f"<li><strong>{_escape(host.name)}</strong> ({_escape(host.hostname)})</li>"
+            for host in unmapped_hosts
+        )
+        parts.append(_UNMAPPED_HOSTS_HTML_TAIL)
 
-        return html
+        return "".join(parts)
 
     def _generate_automated_host_html(self, report) -> str:
         """Generate HTML for a single automated update report."""
-        from .update_automator import UpdateResult
+        result = report.result
+        update_report = report.update_report
 
         # Determine CSS class and status
-        if report.result == UpdateResult.REVERT_FAILED:
-            css_class = "host critical"
-            status_class = "status critical"
-            status_text = "CRITICAL: Revert Failed"
-        elif report.result == UpdateResult.REVERTED:
-            css_class = "host reverted"
-            status_class = "status reverted"
-            status_text = "Reverted to Snapshot"
-        elif report.result in [
-            UpdateResult.FAILED_UPDATES,
-            UpdateResult.FAILED_REBOOT,
-            UpdateResult.FAILED_AVAILABILITY,
-            UpdateResult.FAILED_SNAPSHOT,
-        ]:
-            css_class = "host failed"
-            status_class = "status failed"
-            status_text = f"Failed: {report.result.value.replace('_', ' ').title()}"
-        elif report.result == UpdateResult.SUCCESS:
-            css_class = "host success"
-            status_class = "status success"
-            status_text = "Successfully Updated"
-        elif report.result == UpdateResult.OPT_OUT:
-            css_class = "host opt-out"
-            status_class = "status warning"
-            status_text = "Opt-out (Check Only)"
-        elif report.result == UpdateResult.NO_UPDATES:
-            css_class = "host no-updates"
-            status_class = "status success"
-            status_text = "No Updates Needed"
-        else:
-            css_class = "host unknown"
-            status_class = "status warning"
-            status_text = f"Unknown: {report.result.value}"
-
-        html = f'<div class="{css_class}">'
-        html += (
-            f'<div class="host-name">{report.host.name} ({report.host.hostname})</div>'
+        status = _AUTOMATED_HTML_STATUS.get(result)
+        if status is None:
+            status = (
+                "host unknown",
+                "status warning",
+                f"Unknown: {result.value}",
+            )
+        css_class, status_class, status_text = status
+
+        buf = io.StringIO()
+        w = buf.write
+        w(f'<div class="{css_class}">')
+        # Host, OS, VM, error and package strings come from remote systems and
+        # must not be interpreted as markup
+        w(
+            f'<div class="host-name">{_escape(report.host.name)} ({_escape(report.host.hostname)})</div>'
         )
-        html += f'<div class="{status_class}">{status_text}</div>'
+        w(f'<div class="{status_class}">{status_text}</div>')
 
         # Add timing information
-        if report.end_time:
-            duration = (report.end_time - report.start_time).total_seconds()
-            html += f'<div class="timing">Duration: {int(duration)}s</div>'
+        end_time = report.end_time
+        if end_time:
+            duration = (end_time - report.start_time).total_seconds()
+            w(f'<div class="timing">Duration: {int(duration)}s</div>')
 
         # Add OS info if available
-        if report.update_report.os_info:
-            html += f'<div class="host-details">{report.update_report.os_info}</div>'
+        if update_report.os_info:
+            w(f'<div class="host-details">{_escape(str(update_report.os_info))}</div>')
 
         # Add VM mapping info if available
-        if report.vm_mapping:
-            html += f'<div class="host-details">VM: {report.vm_mapping.vmid} on {report.vm_mapping.node}'
+        vm_mapping = report.vm_mapping
+        if vm_mapping:
+            w(
+                f'<div class="host-details">VM: {vm_mapping.vmid} on {_escape(vm_mapping.node)}'
+            )
             if report.snapshot_name:
-                html += f" (Snapshot: {report.snapshot_name})"
-            html += "</div>"
+                w(f" (Snapshot: {_escape(report.snapshot_name)})")
+            w("</div>")
 
         # Show updates if successful or opt-out
-        if (
-            report.result == UpdateResult.SUCCESS
-            or report.result == UpdateResult.OPT_OUT
-        ) and report.update_report.has_updates:
-            security_updates = report.update_report.security_updates
-            regular_updates = report.update_report.regular_updates
+        is_opt_out = result == UpdateResult.OPT_OUT
+        if (is_opt_out or result == UpdateResult.SUCCESS) and update_report.has_updates:
+            security_updates = update_report.security_updates
+            regular_updates = update_report.regular_updates
 
             # Add prefix for opt-out hosts to clarify these are available updates, not applied ones
-            prefix = "Available " if report.result == UpdateResult.OPT_OUT else ""
-            action = (
-                "require manual application"
-                if report.result == UpdateResult.OPT_OUT
-                else "applied"
-            )
+            prefix = "Available " if is_opt_out else ""
+            action = "require manual application" if is_opt_out else "applied"
 
             if security_updates:
-                html += f"<div><strong>🔒 {prefix}Security Updates ({len(security_updates)}) - {action}:</strong></div>"
-                html += '<div class="updates-list">'
-                for update in security_updates:
-                    html += f'<div class="update-item security-update">{update}</div>'
-                html += "</div>"
+                w(
+                    f"<div><strong>🔒 {prefix}Security Updates ({len(security_updates)}) - {action}:</strong></div>"
+                )
+                w('<div class="updates-list">')
+                w(
+                    "".join(
+                        f'<div class="update-item security-update">{_escape(str(update))}</div>'
+                        for update in security_updates
+                    )
+                )
+                w("</div>")
 
             if regular_updates:
-                html += f"<div><strong>{prefix}Regular Updates ({len(regular_updates)}) - {action}:</strong></div>"
-                html += '<div class="updates-list">'
-                for update in regular_updates:
-                    html += f'<div class="update-item">{update}</div>'
-                html += "</div>"
+                w(
+                    f"<div><strong>{prefix}Regular Updates ({len(regular_updates)}) - {action}:</strong></div>"
+                )
+                w('<div class="updates-list">')
+                w(
+                    "".join(
+                        f'<div class="update-item">{_escape(str(update))}</div>'
+                        for update in regular_updates
+                    )
+                )
+                w("</div>")
 
         # Show error details if there are any
-        if report.error_details:
-            html += f'<div class="error-details"><strong>Error:</strong> {report.error_details}</div>'
-        elif report.update_report.error:
-            html += f'<div class="error-details"><strong>Error:</strong> {report.update_report.error}</div>'
+        error = report.error_details or update_report.error
+        if error:
+            w(
+                f'<div class="error-details"><strong>Error:</strong> {_escape(error)}</div>'
+            )
 
         # Show command output if available (for failed package updates)
-        if report.update_report.command_output:
-            html += f'<div class="error-details"><strong>Command Output:</strong><pre style="white-space: pre-wrap; font-size: 12px; max-height: 300px; overflow-y: auto;">{report.update_report.command_output}</pre></div>'
+        if update_report.command_output:
+            w(
+                f'<div class="error-details"><strong>Command Output:</strong><pre style="white-space: pre-wrap; font-size: 12px; max-height: 300px; overflow-y: auto;">{_escape(update_report.command_output)}</pre></div>'
+            )
 
-        html += "</div>"
-        return html
+        w("</div>")
+        return buf.getvalue()
 
-    def _generate_automated_text_body(self, reports, unmapped_hosts=None) -> str:
+    def _generate_automated_text_body(
+        self, buckets: ResultBuckets, timestamp: str, unmapped_hosts=None
+    ) -> str:
         """Generate plain text email body for automated updates."""
-        from .update_automator import UpdateResult
-
-        text = "🤖 AUTOMATED SYSTEM UPDATES REPORT\n"
-        text += "=" * 50 + "\n"
-        text += f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        parts = [
+            "🤖 AUTOMATED SYSTEM UPDATES REPORT\n",
+            _SEP_EQ50,
+            f"Generated on {timestamp}\n\n",
+        ]
 
         # Summary
-        total = len(reports)
-        successful_updates = sum(1 for r in reports if r.result == UpdateResult.SUCCESS)
-        no_updates_needed = sum(
-            1 for r in reports if r.result == UpdateResult.NO_UPDATES
-        )
-        opt_out_hosts = sum(1 for r in reports if r.result == UpdateResult.OPT_OUT)
-        critical_failures = sum(
-            1 for r in reports if r.result == UpdateResult.REVERT_FAILED
-        )
-        reverted_hosts = sum(1 for r in reports if r.result == UpdateResult.REVERTED)
-        other_failures = (
-            total
-            - successful_updates
-            - no_updates_needed
-            - opt_out_hosts
-            - critical_failures
-            - reverted_hosts
-        )
-
-        text += "📊 SUMMARY\n"
-        text += "-" * 20 + "\n"
-        text += f"Total hosts processed: {total}\n"
-        text += f"✅ Successfully updated: {successful_updates}\n"
-        text += f"📋 No updates needed: {no_updates_needed}\n"
-        text += f"⚠️ Opt-out hosts (check-only): {opt_out_hosts}\n"
-        text += f"🔄 Reverted to snapshot: {reverted_hosts}\n"
-        text += f"❌ Other failures: {other_failures}\n"
-
-        if critical_failures > 0:
-            text += f"🚨 CRITICAL: Revert failures: {critical_failures}\n"
-
-        text += "\n"
+        counts = self._result_counts(buckets)
+        parts.append(f"""📊 SUMMARY
+--------------------
+Total hosts processed: {buckets.total_hosts}
+✅ Successfully updated: {counts.successful}
+📋 No updates needed: {counts.no_updates}
+⚠️ Opt-out hosts (check-only): {counts.opt_out}
+🔄 Reverted to snapshot: {counts.reverted}
+❌ Other failures: {counts.failed}
+""")
+
+        if counts.critical > 0:
+            parts.append(f"🚨 CRITICAL: Revert failures: {counts.critical}\n")
+
+        parts.append("\n")
 
         # Show unmapped hosts warning if there are any
         if unmapped_hosts:
-            text += "🚨 CONFIGURATION WARNING: UNMAPPED INVENTORY HOSTS\n"
-            text += "=" * 60 + "\n"
-            text += "The following hosts are not configured in either the VM mapping\n"
-            text += "file or the opt-out list:\n\n"
-            for host in unmapped_hosts:
-                text += f"  - {host.name} ({host.hostname})\n"
-            text += "\nACTION REQUIRED:\n"
-            text += "- Add these hosts to your vm_mapping.toml file if they should\n"
-            text += "  receive automated updates, OR\n"
-            text += "- Add them to the opt_out_hosts list in config.toml if they\n"
-            text += "  should only be checked (no automated updates)\n"
-            text += "\nWithout proper configuration, these hosts may not behave as\n"
-            text += "expected during automated updates.\n"
-            text += "\n"
+            parts.append(_UNMAPPED_HOSTS_TEXT_HEAD)
+            parts.extend(
+                f"  - {host.name} ({host.hostname})\n" for host in unmapped_hosts
+            )
+            parts.append(_UNMAPPED_HOSTS_TEXT_TAIL)
 
         # Group and show hosts
-        critical_hosts = [r for r in reports if r.result == UpdateResult.REVERT_FAILED]
-        reverted_hosts = [r for r in reports if r.result == UpdateResult.REVERTED]
-        failed_hosts = [
-            r
-            for r in reports
-            if r.result
-            in [
-                UpdateResult.FAILED_UPDATES,
-                UpdateResult.FAILED_REBOOT,
-                UpdateResult.FAILED_AVAILABILITY,
-                UpdateResult.FAILED_SNAPSHOT,
-            ]
-        ]
-        successful_hosts = [r for r in reports if r.result == UpdateResult.SUCCESS]
-        opt_out_hosts = [r for r in reports if r.result == UpdateResult.OPT_OUT]
-        no_update_hosts = [r for r in reports if r.result == UpdateResult.NO_UPDATES]
+        by_result = buckets.by_result
+        critical_hosts = by_result[UpdateResult.REVERT_FAILED]
+        reverted_hosts = by_result[UpdateResult.REVERTED]
+        failed_hosts = _failed_hosts(by_result)
+        successful_hosts = by_result[UpdateResult.SUCCESS]
+        opt_out_hosts = by_result[UpdateResult.OPT_OUT]
+        no_update_hosts = by_result[UpdateResult.NO_UPDATES]
 
         if critical_hosts:
-            text += "🚨 CRITICAL FAILURES (Revert Failed)\n"
-            text += "-" * 40 + "\n"
+            parts.append("🚨 CRITICAL FAILURES (Revert Failed)\n")
+            parts.append(_SEP_DASH40)
             for report in critical_hosts:
-                text += self._generate_automated_host_text(report)
-                text += "\n"
+                self._append_automated_host_text(parts, report)
+                parts.append("\n")
 
         if reverted_hosts:
-            text += "⚠️ REVERTED HOSTS\n"
-            text += "-" * 20 + "\n"
+            parts.append("⚠️ REVERTED HOSTS\n")
+            parts.append(_SEP_DASH20)
             for report in reverted_hosts:
-                text += self._generate_automated_host_text(report)
-                text += "\n"
+                self._append_automated_host_text(parts, report)
+                parts.append("\n")
 
         if failed_hosts:
-            text += "❌ FAILED UPDATES\n"
-            text += "-" * 20 + "\n"
+            parts.append("❌ FAILED UPDATES\n")
+            parts.append(_SEP_DASH20)
             for report in failed_hosts:
-                text += self._generate_automated_host_text(report)
-                text += "\n"
+                self._append_automated_host_text(parts, report)
+                parts.append("\n")
 
         if successful_hosts:
-            text += "✅ SUCCESSFULLY UPDATED\n"
-            text += "-" * 25 + "\n"
+            parts.append("✅ SUCCESSFULLY UPDATED\n")
+            parts.append(_SEP_DASH25)
             for report in successful_hosts:
-                text += self._generate_automated_host_text(report)
-                text += "\n"
+                self._append_automated_host_text(parts, report)
+                parts.append("\n")
 
         if opt_out_hosts:
-            text += "⚠️ OPT-OUT HOSTS (CHECK ONLY)\n"
-            text += "-" * 30 + "\n"
+            parts.append("⚠️ OPT-OUT HOSTS (CHECK ONLY)\n")
+            parts.append(_SEP_DASH30)
             for report in opt_out_hosts:
-                text += self._generate_automated_host_text(report)
-                text += "\n"
+                self._append_automated_host_text(parts, report)
+                parts.append("\n")
 
         if no_update_hosts:
-            text += "📋 NO UPDATES NEEDED\n"
-            text += "-" * 25 + "\n"
+            parts.append("📋 NO UPDATES NEEDED\n")
+            parts.append(_SEP_DASH25)
             for report in no_update_hosts:
-                text += self._generate_automated_host_text(report)
-                text += "\n"
+                self._append_automated_host_text(parts, report)
+                parts.append("\n")
 
-        return text
+        return "".join(parts)
 
-    def _generate_automated_host_text(self, report) -> str:
-        """Generate plain text for a single automated update report."""
-        from .update_automator import UpdateResult
+    def _append_automated_host_text(self, parts: List[str], report) -> None:
+        """Append plain text for a single automated update report to parts."""
+        result = report.result
+        update_report = report.update_report
 
-        text = f"{report.host.name} ({report.host.hostname})\n"
+        parts.append(f"{report.host.name} ({report.host.hostname})\n")
 
         # Status
-        if report.result == UpdateResult.REVERT_FAILED:
-            text += "  Status: 🚨 CRITICAL - Revert Failed\n"
-        elif report.result == UpdateResult.REVERTED:
-            text += "  Status: 🔄 Reverted to Snapshot\n"
-        elif report.result in [
-            UpdateResult.FAILED_UPDATES,
-            UpdateResult.FAILED_REBOOT,
-            UpdateResult.FAILED_AVAILABILITY,
-            UpdateResult.FAILED_SNAPSHOT,
-        ]:
-            text += f"  Status: ❌ Failed - {report.result.value.replace('_', ' ').title()}\n"
-        elif report.result == UpdateResult.SUCCESS:
-            text += "  Status: ✅ Successfully Updated\n"
-        elif report.result == UpdateResult.OPT_OUT:
-            text += "  Status: ⚠️ Opt-out (Check Only)\n"
-        elif report.result == UpdateResult.NO_UPDATES:
-            text += "  Status: 📋 No Updates Needed\n"
-        else:
-            text += f"  Status: ❓ Unknown ({report.result.value})\n"
+        status_line = _AUTOMATED_TEXT_STATUS.get(result)
+        if status_line is None:
+            status_line = f"  Status: ❓ Unknown ({result.value})\n"
+        parts.append(status_line)
 
         # Timing
-        if report.end_time:
-            duration = (report.end_time - report.start_time).total_seconds()
-            text += f"  Duration: {int(duration)}s\n"
+        end_time = report.end_time
+        if end_time:
+            duration = (end_time - report.start_time).total_seconds()
+            parts.append(f"  Duration: {int(duration)}s\n")
 
         # OS info
-        if report.update_report.os_info:
-            text += f"  OS: {report.update_report.os_info}\n"
+        if update_report.os_info:
+            parts.append(f"  OS: {update_report.os_info}\n")
 
         # VM info
-        if report.vm_mapping:
-            text += f"  VM: {report.vm_mapping.vmid} on {report.vm_mapping.node}\n"
+        vm_mapping = report.vm_mapping
+        if vm_mapping:
+            parts.append(f"  VM: {vm_mapping.vmid} on {vm_mapping.node}\n")
             if report.snapshot_name:
-                text += f"  Snapshot: {report.snapshot_name}\n"
+                parts.append(f"  Snapshot: {report.snapshot_name}\n")
 
         # Updates
-        if (
-            report.result == UpdateResult.SUCCESS
-            or report.result == UpdateResult.OPT_OUT
-        ) and report.update_report.has_updates:
-            security_updates = report.update_report.security_updates
-            regular_updates = report.update_report.regular_updates
+        is_opt_out = result == UpdateResult.OPT_OUT
+        if (is_opt_out or result == UpdateResult.SUCCESS) and update_report.has_updates:
+            security_updates = update_report.security_updates
+            regular_updates = update_report.regular_updates
 
             # Add prefix for opt-out hosts to clarify these are available updates, not applied ones
-            prefix = "Available " if report.result == UpdateResult.OPT_OUT else ""
+            prefix = "Available " if is_opt_out else ""
 
             if security_updates:
-                text += f"  🔒 {prefix}Security Updates ({len(security_updates)}):\n"
-                for update in security_updates:
-                    text += f"    - {update}\n"
+                parts.append(
+                    f"  🔒 {prefix}Security Updates ({len(security_updates)}):\n"
+                )
+                parts.extend(
+                    ("    - ", "\n    - ".join(map(str, security_updates)), "\n")
+                )
 
             if regular_updates:
-                text += f"  {prefix}Regular Updates ({len(regular_updates)}):\n"
-                for update in regular_updates:
-                    text += f"    - {update}\n"
+                parts.append(f"  {prefix}Regular Updates ({len(regular_updates)}):\n")
+                parts.extend(
+                    ("    - ", "\n    - ".join(map(str, regular_updates)), "\n")
+                )
 
-            if report.result == UpdateResult.OPT_OUT:
-                text += "  ⚠️ Note: Updates listed above require manual application\n"
+            if is_opt_out:
+                parts.append(
+                    "  ⚠️ Note: Updates listed above require manual application\n"
+                )
 
         # Errors
-        if report.error_details:
-            text += f"  Error: {report.error_details}\n"
-        elif report.update_report.error:
-            text += f"  Error: {report.update_report.error}\n"
+        error = report.error_details or update_report.error
+        if error:
+            parts.append(f"  Error: {error}\n")
 
         # Command output if available (for failed package updates)
-        if report.update_report.command_output:
-            text += f"  Command Output:\n"
+        output = update_report.command_output
+        if output:
+            if not output.endswith("\n"):
+                output += "\n"
             # Indent the command output for better readability
-            for line in report.update_report.command_output.split("\n"):
-                text += f"    {line}\n"
-
-        return text
+            parts.extend(("  Command Output:\n", textwrap.indent(output, "    ")))
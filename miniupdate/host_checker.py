@@ -5,14 +5,26 @@ Provides utilities to check if hosts are reachable via ping and SSH.
 """
 
 import logging
+import shutil
+import socket
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 from .inventory import Host
 from .ssh_manager import SSHManager
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent checks; each one mostly waits on the network
+_MAX_CHECK_WORKERS = 64
+
+# Availability polling starts at this interval (seconds) and grows by
+# _POLL_BACKOFF per attempt up to the caller's check_interval
+_INITIAL_POLL_INTERVAL = 1.0
+_POLL_BACKOFF = 1.5
+
 
 class HostChecker:
     """Checks host availability via ping and SSH."""
@@ -38,15 +50,123 @@ class HostChecker:
             True if host responds to ping, False otherwise
         """
         try:
-            # Use ping command with timeout
-            cmd = ["ping", "-c", "1", "-W", str(timeout), hostname]
+            # Single quiet, numeric ping; only the exit status is used, so
+            # the output is discarded rather than piped back
+            cmd = ["ping", "-n", "-q", "-c", "1", "-W", str(timeout), hostname]
             result = subprocess.run(
-                cmd, capture_output=True, timeout=timeout + 2, check=False
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout + 2,
+                check=False,
             )
             return result.returncode == 0
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError):
+        except (subprocess.TimeoutExpired, subprocess.SubprocessError, OSError):
             return False
 
+    def ping_hosts(self, hostnames: List[str], timeout: int = 5) -> Dict[str, bool]:
+        """
+        Ping several hosts concurrently.
+
+        Args:
+            hostnames: Hostnames or IP addresses to ping
+            timeout: Ping timeout in seconds
+
+        Returns:
+            Dictionary mapping each hostname to whether it responded
+        """
+        if not hostnames:
+            return {}
+
+        fping = shutil.which("fping")
+        if fping:
+            results = self._fping_hosts(fping, hostnames, timeout)
+            if results is not None:
+                return results
+
+        with ThreadPoolExecutor(
+            max_workers=min(_MAX_CHECK_WORKERS, len(hostnames))
+        ) as executor:
+            results = executor.map(
+                lambda hostname: self.ping_host(hostname, timeout), hostnames
+            )
+            return dict(zip(hostnames, results))
+
+    @staticmethod
+    def _fping_hosts(
+        fping: str, hostnames: List[str], timeout: int
+    ) -> Optional[Dict[str, bool]]:
+        """
+        Ping several hosts with a single fping process.
+
+        Args:
+            fping: Path to the fping binary
+            hostnames: Hostnames or IP addresses to ping
+            timeout: Ping timeout in seconds
+
+        Returns:
+            Dictionary mapping each hostname to whether it responded, or None
+            if fping could not be run
+        """
+        cmd = [fping, "-c", "1", "-t", str(timeout * 1000), "-q", *hostnames]
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=timeout * 2 + 5,
+                check=False,
+            )
+        except (subprocess.TimeoutExpired, subprocess.SubprocessError, OSError):
+            return None
+
+        # With -q, fping reports one summary line per host on stderr:
+        # "host : xmt/rcv/%loss = 1/1/0%, min/avg/max = ..."
+        results = dict.fromkeys(hostnames, False)
+        for line in result.stderr.splitlines():
+            name, sep, stats = line.partition(" : ")
+            if not sep or name.strip() not in results:
+                continue
+            _, sep, counts = stats.partition(" = ")
+            received = counts.split("/", 2)[1:2]
+            if sep and received and received[0].isdigit():
+                results[name.strip()] = int(received[0]) > 0
+        return results
+
+    def wait_for_hosts_availability(
+        self,
+        hosts: List[Host],
+        max_wait_time: int = 120,
+        check_interval: int = 5,
+        use_ssh: bool = True,
+    ) -> Dict[str, bool]:
+        """
+        Wait for several hosts to become available, polling them concurrently.
+
+        Args:
+            hosts: Host objects to check
+            max_wait_time: Maximum time to wait per host in seconds
+            check_interval: Time between checks in seconds
+            use_ssh: Whether to also check SSH connectivity
+
+        Returns:
+            Dictionary mapping host name to whether it became available
+        """
+        if not hosts:
+            return {}
+
+        with ThreadPoolExecutor(
+            max_workers=min(_MAX_CHECK_WORKERS, len(hosts))
+        ) as executor:
+            results = executor.map(
+                lambda host: self.wait_for_host_availability(
+                    host, max_wait_time, check_interval, use_ssh
+                ),
+                hosts,
+            )
+            return {host.name: available for host, available in zip(hosts, results)}
+
     def wait_for_host_availability(
         self,
         host: Host,
@@ -60,7 +180,8 @@ class HostChecker:
         Args:
             host: Host object to check
             max_wait_time: Maximum time to wait in seconds
-            check_interval: Time between checks in seconds
+            check_interval: Maximum time between checks in seconds; polling
+                starts faster and backs off to this interval
             use_ssh: Whether to also check SSH connectivity
 
         Returns:
@@ -72,64 +193,112 @@ class HostChecker:
             max_wait_time,
         )
 
-        start_time = time.time()
+        start_time = time.monotonic()
         attempt = 0
+        delay = min(_INITIAL_POLL_INTERVAL, check_interval)
+
+        # One SSH manager for all attempts, so a working connection is reused
+        with SSHManager(self.ssh_config) as ssh_manager:
+            while time.monotonic() - start_time < max_wait_time:
+                attempt += 1
+                elapsed = int(time.monotonic() - start_time)
+
+                logger.debug(
+                    "Checking %s availability - attempt %s (%ss elapsed)",
+                    host.name,
+                    attempt,
+                    elapsed,
+                )
 
-        while time.time() - start_time < max_wait_time:
-            attempt += 1
-            elapsed = int(time.time() - start_time)
-
-            logger.debug(
-                "Checking %s availability - attempt %s (%ss elapsed)",
-                host.name,
-                attempt,
-                elapsed,
-            )
-
-            # First check ping
-            if not self.ping_host(host.hostname):
-                logger.debug("%s not responding to ping", host.name)
-                time.sleep(check_interval)
-                continue
-
-            logger.debug("%s responding to ping", host.name)
-
-            # If SSH check is requested, verify SSH connectivity
-            if use_ssh:
-                if self._check_ssh_connectivity(host):
+                # First check ping
+                if not self.ping_host(host.hostname):
+                    logger.debug("%s not responding to ping", host.name)
+                    delay = self._poll_sleep(delay, check_interval)
+                    continue
+
+                logger.debug("%s responding to ping", host.name)
+
+                # If SSH check is requested, verify SSH connectivity
+                if use_ssh:
+                    if self._check_ssh_connectivity(host, ssh_manager):
+                        logger.info(
+                            "%s is available (ping + SSH) after %ss", host.name, elapsed
+                        )
+                        return True
+                    logger.debug("%s ping OK but SSH not ready", host.name)
+                else:
                     logger.info(
-                        "%s is available (ping + SSH) after %ss", host.name, elapsed
+                        "%s is available (ping only) after %ss", host.name, elapsed
                     )
                     return True
-                logger.debug("%s ping OK but SSH not ready", host.name)
-            else:
-                logger.info("%s is available (ping only) after %ss", host.name, elapsed)
-                return True
 
-            time.sleep(check_interval)
+                delay = self._poll_sleep(delay, check_interval)
 
-        elapsed = int(time.time() - start_time)
+        elapsed = int(time.monotonic() - start_time)
         logger.warning("%s did not become available within %ss", host.name, elapsed)
         return False
 
-    def _check_ssh_connectivity(self, host: Host) -> bool:
+    @staticmethod
+    def _poll_sleep(delay: float, max_delay: float) -> float:
+        """Sleep for delay seconds and return the next, backed-off delay."""
+        time.sleep(delay)
+        return min(delay * _POLL_BACKOFF, max_delay)
+
+    @staticmethod
+    def _tcp_probe(host: Host, port: int, timeout: float = 2.0) -> bool:
+        """
+        Check whether a TCP port on host accepts connections.
+
+        Args:
+            host: Host to probe
+            port: TCP port to connect to
+            timeout: Connect timeout in seconds
+
+        Returns:
+            True if the connection was accepted, False otherwise
+        """
+        try:
+            with socket.create_connection((host.hostname, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def _check_ssh_connectivity(self, host: Host, ssh_manager: SSHManager) -> bool:
         """
         Check if SSH connection to host is possible.
 
+        A connection opened by an earlier attempt is reused; one that stops
+        working is dropped so the next attempt reconnects.
+
         Args:
             host: Host to check SSH connectivity
+            ssh_manager: SSH manager holding connections across attempts
 
         Returns:
             True if SSH connection successful, False otherwise
         """
         try:
-            with SSHManager(self.ssh_config) as ssh_manager:
+            connection = ssh_manager.connections.get(host.name)
+            if connection is None:
+                # A plain TCP connect tells whether sshd is listening yet,
+                # without paying for a full SSH handshake
+                if not self._tcp_probe(host, host.port):
+                    logger.debug(
+                        "%s port %s not accepting connections", host.name, host.port
+                    )
+                    return False
                 connection = ssh_manager.connect_to_host(host, timeout=10)
-                if connection:
-                    # Test basic command execution
-                    exit_code, _, _ = connection.execute_command("echo test", timeout=5)
-                    return exit_code == 0
-                return False
+                if not connection:
+                    return False
+
+            # Test basic command execution
+            exit_code, _, _ = connection.execute_command("true", timeout=5)
+            if exit_code == 0:
+                return True
+
+            connection.disconnect()
+            ssh_manager.connections.pop(host.name, None)
+            return False
         except Exception as e:
             logger.debug("SSH connectivity check failed for %s: %s", host.name, e)
             return False
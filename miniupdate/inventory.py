@@ -6,10 +6,17 @@ Supports parsing YAML and INI format Ansible inventory files.
 
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 
 import yaml
 
+# Prefer the libyaml-backed loader and dumper; they handle the same safe
+# subset much faster
+try:
+    from yaml import CSafeDumper as _SafeDumper, CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper, SafeLoader as _SafeLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,13 +51,13 @@ class InventoryParser:
 
     def parse(self) -> List[Host]:
         """Parse inventory file and return list of hosts."""
-        if self.inventory_path.suffix.lower() in [".yml", ".yaml"]:
+        suffix = self.inventory_path.suffix.lower()
+        if suffix in (".yml", ".yaml"):
             return self._parse_yaml()
-        if self.inventory_path.suffix.lower() in [
-            ".ini",
-            ".cfg",
-            "",
-        ] or self.inventory_path.name in ["hosts", "inventory"]:
+        if suffix in (".ini", ".cfg", "") or self.inventory_path.name in (
+            "hosts",
+            "inventory",
+        ):
             return self._parse_ini()
         # Try YAML first, then INI
         try:
@@ -62,7 +69,7 @@ class InventoryParser:
         """Parse YAML format inventory."""
         try:
             with open(self.inventory_path, "r", encoding="utf-8") as f:
-                inventory = yaml.safe_load(f)
+                inventory = yaml.load(f, Loader=_SafeLoader)
         except Exception as e:
             raise ValueError(f"Error parsing YAML inventory: {e}") from e
 
@@ -114,32 +121,31 @@ class InventoryParser:
 
     def _parse_ini(self) -> List[Host]:
         """Parse INI format inventory."""
-        hosts = []
-
         try:
             with open(self.inventory_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        except Exception as e:
+                return self._parse_ini_lines(f)
+        except (OSError, UnicodeDecodeError) as e:
             raise ValueError(f"Error reading INI inventory: {e}") from e
 
-        # Split into lines and process
-        lines = content.split("\n")
-        current_group = None
+    def _parse_ini_lines(self, lines: Iterable[str]) -> List[Host]:
+        """Parse INI inventory lines as they are read."""
+        hosts = []
+        in_vars = False
 
         for line in lines:
             line = line.strip()
 
             # Skip empty lines and comments
-            if not line or line.startswith("#") or line.startswith(";"):
+            if not line or line.startswith(("#", ";")):
                 continue
 
             # Group header
             if line.startswith("[") and line.endswith("]"):
-                current_group = line[1:-1]
+                in_vars = ":vars" in line[1:-1]
                 continue
 
             # Skip group variables sections
-            if current_group and ":vars" in current_group:
+            if in_vars:
                 continue
 
             # Parse host line
@@ -161,19 +167,17 @@ class InventoryParser:
 
         # Parse variables
         for part in parts[1:]:
-            if "=" in part:
-                key, value = part.split("=", 1)
+            key, sep, value = part.partition("=")
+            if sep:
                 variables[key] = value
 
         # Parse hostname and port
-        if ":" in host_part:
-            hostname, port_str = host_part.rsplit(":", 1)
-            try:
-                port = int(port_str)
-            except ValueError:
-                hostname = host_part
-                port = 22
-        else:
+        hostname, sep, port_str = host_part.rpartition(":")
+        try:
+            port = int(port_str) if sep else None
+        except ValueError:
+            port = None
+        if port is None:
             hostname = host_part
             port = 22
 
@@ -212,4 +216,10 @@ def create_example_inventory(path: str = "inventory.yml.example") -> None:
     }
 
     with open(path, "w", encoding="utf-8") as f:
-        yaml.dump(example_inventory, f, default_flow_style=False, indent=2)
+        yaml.dump(
+            example_inventory,
+            f,
+            Dumper=_SafeDumper,
+            default_flow_style=False,
+            indent=2,
+        )
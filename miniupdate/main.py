@@ -7,16 +7,17 @@ Orchestrates the process of checking updates across hosts and sending email repo
 import click
 import logging
 import sys
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .config import Config, create_example_config
 from .inventory import InventoryParser, create_example_inventory
 from .vm_mapping import create_example_vm_mapping
 from .ssh_manager import SSHManager
-from .os_detector import OSDetector
+from .os_detector import OSDetector, OSInfoCache
 from .package_managers import get_package_manager
 from .email_sender import EmailSender, UpdateReport
 from .update_automator import UpdateAutomator, AutomatedUpdateReport, UpdateResult
@@ -51,9 +52,9 @@ def validate_inventory_mapping(hosts, config, vm_mapper):
     return unmapped_hosts
 
 
-def process_host(host, ssh_config, config, timeout=120):
+def process_host(host, ssh_config, config, timeout=120, os_cache=None):
     """Process a single host - detect OS and check for updates."""
-    logger.info(f"Processing host: {host.name}")
+    logger.info("Processing host: %s", host.name)
 
     try:
         with SSHManager(ssh_config) as ssh_manager:
@@ -63,7 +64,7 @@ def process_host(host, ssh_config, config, timeout=120):
                 return UpdateReport(host, None, [], error="Failed to connect via SSH")
 
             # Detect OS
-            os_detector = OSDetector(connection)
+            os_detector = OSDetector(connection, os_cache)
             os_info = os_detector.detect_os()
 
             if not os_info:
@@ -82,12 +83,12 @@ def process_host(host, ssh_config, config, timeout=120):
                 )
 
             # Refresh package cache
-            logger.info(f"Refreshing package cache on {host.name}")
+            logger.info("Refreshing package cache on %s", host.name)
             if not package_manager.refresh_cache():
-                logger.warning(f"Failed to refresh package cache on {host.name}")
+                logger.warning("Failed to refresh package cache on %s", host.name)
 
             # Check for updates
-            logger.info(f"Checking for updates on {host.name}")
+            logger.info("Checking for updates on %s", host.name)
             updates = package_manager.check_updates()
 
             # Check if this host is in the opt-out list
@@ -95,20 +96,29 @@ def process_host(host, ssh_config, config, timeout=120):
             is_opt_out_host = host.name in opt_out_hosts
 
             if is_opt_out_host:
-                logger.info(f"Host {host.name} is in opt-out list - check-only mode")
+                logger.info("Host %s is in opt-out list - check-only mode", host.name)
 
             logger.info(
-                f"Found {len(updates)} updates on {host.name} "
-                f"({sum(1 for u in updates if u.security)} security)"
+                "Found %s updates on %s (%s security)",
+                len(updates),
+                host.name,
+                sum(1 for u in updates if u.security),
             )
 
             return UpdateReport(host, os_info, updates)
 
     except Exception as e:
-        logger.error(f"Error processing host {host.name}: {e}")
+        logger.error("Error processing host %s: %s", host.name, e)
         return UpdateReport(host, None, [], error=str(e))
 
 
+def _resolve_parallel(parallel: Optional[int], config: Config) -> int:
+    """Use the --parallel value, falling back to settings.parallel_connections."""
+    if parallel is None:
+        parallel = config.settings_config.get("parallel_connections", 5)
+    return max(1, int(parallel))
+
+
 @click.group()
 @click.option("--config", "-c", help="Configuration file path")
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
@@ -123,7 +133,13 @@ def cli(ctx, config, verbose):
 
 
 @cli.command()
-@click.option("--parallel", "-p", default=5, help="Number of parallel connections")
+@click.option(
+    "--parallel",
+    "-p",
+    type=int,
+    default=None,
+    help="Number of parallel connections (default: settings.parallel_connections)",
+)
 @click.option("--timeout", "-t", default=120, help="SSH timeout in seconds")
 @click.option(
     "--dry-run", is_flag=True, help="Show what would be done without sending email"
@@ -134,12 +150,13 @@ def check(ctx, parallel, timeout, dry_run):
     try:
         # Load configuration
         config = Config(ctx.obj.get("config_path"))
-        logger.info(f"Loaded configuration from {config.config_path}")
+        logger.info("Loaded configuration from %s", config.config_path)
+        parallel = _resolve_parallel(parallel, config)
 
         # Parse inventory
         inventory_parser = InventoryParser(config.inventory_path)
         hosts = inventory_parser.parse()
-        logger.info(f"Loaded {len(hosts)} hosts from inventory")
+        logger.info("Loaded %s hosts from inventory", len(hosts))
 
         if not hosts:
             logger.error("No hosts found in inventory")
@@ -147,15 +164,16 @@ def check(ctx, parallel, timeout, dry_run):
 
         # Process hosts in parallel
         logger.info(
-            f"Processing {len(hosts)} hosts with {parallel} parallel connections"
+            "Processing %s hosts with %s parallel connections", len(hosts), parallel
         )
         reports = []
+        os_cache = OSInfoCache(config.settings_config)
 
         with ThreadPoolExecutor(max_workers=parallel) as executor:
             # Submit all host processing tasks
             future_to_host = {
                 executor.submit(
-                    process_host, host, config.ssh_config, config, timeout
+                    process_host, host, config.ssh_config, config, timeout, os_cache
                 ): host
                 for host in hosts
             }
@@ -169,21 +187,23 @@ def check(ctx, parallel, timeout, dry_run):
 
                     # Log summary for this host
                     if report.error:
-                        logger.warning(f"{host.name}: ERROR - {report.error}")
+                        logger.warning("%s: ERROR - %s", host.name, report.error)
                     elif report.has_security_updates:
                         logger.warning(
-                            f"{host.name}: {len(report.security_updates)} SECURITY updates, "
-                            f"{len(report.regular_updates)} regular updates"
+                            "%s: %s SECURITY updates, %s regular updates",
+                            host.name,
+                            len(report.security_updates),
+                            len(report.regular_updates),
                         )
                     elif report.has_updates:
                         logger.info(
-                            f"{host.name}: {len(report.updates)} updates available"
+                            "%s: %s updates available", host.name, len(report.updates)
                         )
                     else:
-                        logger.info(f"{host.name}: No updates needed")
+                        logger.info("%s: No updates needed", host.name)
 
                 except Exception as e:
-                    logger.error(f"Host {host.name} processing failed: {e}")
+                    logger.error("Host %s processing failed: %s", host.name, e)
                     reports.append(UpdateReport(host, None, [], error=str(e)))
 
         # Generate summary
@@ -196,15 +216,24 @@ def check(ctx, parallel, timeout, dry_run):
             1 for r in reports if r.host.name in opt_out_hosts and r.has_updates
         )
 
-        logger.info(f"\nSUMMARY:")
-        logger.info(f"Total hosts checked: {total_hosts}")
-        logger.info(f"Hosts with updates: {hosts_with_updates}")
-        logger.info(f"Hosts with security updates: {hosts_with_security}")
-        logger.info(f"Hosts with errors: {hosts_with_errors}")
+        # Logged as one record rather than one handler dispatch per line
+        summary = (
+            "\nSUMMARY:\n"
+            "Total hosts checked: %s\n"
+            "Hosts with updates: %s\n"
+            "Hosts with security updates: %s\n"
+            "Hosts with errors: %s"
+        )
+        summary_args = [
+            total_hosts,
+            hosts_with_updates,
+            hosts_with_security,
+            hosts_with_errors,
+        ]
         if opt_out_hosts:
-            logger.info(
-                f"Opt-out hosts (check-only): {len(opt_out_hosts)} ({opt_out_with_updates} with updates)"
-            )
+            summary += "\nOpt-out hosts (check-only): %s (%s with updates)"
+            summary_args += [len(opt_out_hosts), opt_out_with_updates]
+        logger.info(summary, *summary_args)
 
         # Send email report
         if not dry_run:
@@ -222,12 +251,18 @@ def check(ctx, parallel, timeout, dry_run):
         return 0
 
     except Exception as e:
-        logger.error(f"Application error: {e}")
+        logger.error("Application error: %s", e)
         return 1
 
 
 @cli.command()
-@click.option("--parallel", "-p", default=5, help="Number of parallel connections")
+@click.option(
+    "--parallel",
+    "-p",
+    type=int,
+    default=None,
+    help="Number of parallel connections (default: settings.parallel_connections)",
+)
 @click.option("--timeout", "-t", default=120, help="SSH timeout in seconds")
 @click.option(
     "--dry-run", is_flag=True, help="Show what would be done without applying updates"
@@ -238,12 +273,13 @@ def update(ctx, parallel, timeout, dry_run):
     try:
         # Load configuration
         config = Config(ctx.obj.get("config_path"))
-        logger.info(f"Loaded configuration from {config.config_path}")
+        logger.info("Loaded configuration from %s", config.config_path)
+        parallel = _resolve_parallel(parallel, config)
 
         # Parse inventory
         inventory_parser = InventoryParser(config.inventory_path)
         hosts = inventory_parser.parse()
-        logger.info(f"Loaded {len(hosts)} hosts from inventory")
+        logger.info("Loaded %s hosts from inventory", len(hosts))
 
         if not hosts:
             logger.error("No hosts found in inventory")
@@ -256,10 +292,10 @@ def update(ctx, parallel, timeout, dry_run):
         unmapped_hosts = validate_inventory_mapping(hosts, config, automator.vm_mapper)
         if unmapped_hosts:
             logger.warning(
-                f"Found {len(unmapped_hosts)} hosts not in VM mapping or opt-out list:"
+                "Found %s hosts not in VM mapping or opt-out list:", len(unmapped_hosts)
             )
             for host in unmapped_hosts:
-                logger.warning(f"  - {host.name} ({host.hostname})")
+                logger.warning("  - %s (%s)", host.name, host.hostname)
             logger.warning(
                 "These hosts will be processed but may need manual configuration."
             )
@@ -271,7 +307,9 @@ def update(ctx, parallel, timeout, dry_run):
 
         # Process hosts in parallel for automated updates
         logger.info(
-            f"Processing {len(hosts)} hosts with automated updates using {parallel} parallel connections"
+            "Processing %s hosts with automated updates using %s parallel connections",
+            len(hosts),
+            parallel,
         )
         reports = []
 
@@ -294,32 +332,41 @@ def update(ctx, parallel, timeout, dry_run):
                     # Log summary for this host
                     if report.result == UpdateResult.SUCCESS:
                         logger.info(
-                            f"{host.name}: SUCCESS - Applied {len(report.update_report.updates)} updates"
+                            "%s: SUCCESS - Applied %s updates",
+                            host.name,
+                            len(report.update_report.updates),
                         )
                     elif report.result == UpdateResult.NO_UPDATES:
                         logger.info(
-                            f"{host.name}: NO UPDATES - All packages up to date"
+                            "%s: NO UPDATES - All packages up to date", host.name
                         )
                     elif report.result == UpdateResult.OPT_OUT:
                         if report.update_report.has_updates:
                             logger.info(
-                                f"{host.name}: OPT-OUT - {len(report.update_report.updates)} updates available (manual action required)"
+                                "%s: OPT-OUT - %s updates available (manual action required)",
+                                host.name,
+                                len(report.update_report.updates),
                             )
                         else:
-                            logger.info(f"{host.name}: OPT-OUT - No updates available")
+                            logger.info("%s: OPT-OUT - No updates available", host.name)
                     elif report.result == UpdateResult.REVERTED:
-                        logger.error(f"{host.name}: REVERTED - {report.error_details}")
+                        logger.error(
+                            "%s: REVERTED - %s", host.name, report.error_details
+                        )
                     elif report.result == UpdateResult.REVERT_FAILED:
                         logger.critical(
-                            f"{host.name}: REVERT FAILED - {report.error_details}"
+                            "%s: REVERT FAILED - %s", host.name, report.error_details
                         )
                     else:
                         logger.error(
-                            f"{host.name}: {report.result.value.upper()} - {report.error_details}"
+                            "%s: %s - %s",
+                            host.name,
+                            report.result.value.upper(),
+                            report.error_details,
                         )
 
                 except Exception as e:
-                    logger.error(f"Host {host.name} processing failed: {e}")
+                    logger.error("Host %s processing failed: %s", host.name, e)
                     # Create error report
                     error_report = AutomatedUpdateReport(
                         host=host,
@@ -335,36 +382,36 @@ def update(ctx, parallel, timeout, dry_run):
 
         # Generate summary
         total_hosts = len(reports)
-        successful_updates = sum(1 for r in reports if r.result == UpdateResult.SUCCESS)
-        no_updates_needed = sum(
-            1 for r in reports if r.result == UpdateResult.NO_UPDATES
-        )
-        opt_out_hosts = sum(1 for r in reports if r.result == UpdateResult.OPT_OUT)
-        failed_updates = sum(
-            1
-            for r in reports
-            if r.result
-            in [
-                UpdateResult.FAILED_UPDATES,
-                UpdateResult.FAILED_REBOOT,
-                UpdateResult.FAILED_AVAILABILITY,
-                UpdateResult.FAILED_SNAPSHOT,
-            ]
-        )
-        reverted_hosts = sum(1 for r in reports if r.result == UpdateResult.REVERTED)
-        critical_failures = sum(
-            1 for r in reports if r.result == UpdateResult.REVERT_FAILED
+        result_counts = Counter(r.result for r in reports)
+        successful_updates = result_counts[UpdateResult.SUCCESS]
+        no_updates_needed = result_counts[UpdateResult.NO_UPDATES]
+        opt_out_hosts = result_counts[UpdateResult.OPT_OUT]
+        failed_updates = (
+            result_counts[UpdateResult.FAILED_UPDATES]
+            + result_counts[UpdateResult.FAILED_REBOOT]
+            + result_counts[UpdateResult.FAILED_AVAILABILITY]
+            + result_counts[UpdateResult.FAILED_SNAPSHOT]
         )
+        reverted_hosts = result_counts[UpdateResult.REVERTED]
+        critical_failures = result_counts[UpdateResult.REVERT_FAILED]
 
-        logger.info(f"\nUPDATE SUMMARY:")
-        logger.info(f"Total hosts processed: {total_hosts}")
-        logger.info(f"Successfully updated: {successful_updates}")
-        logger.info(f"No updates needed: {no_updates_needed}")
-        logger.info(f"Opt-out hosts (check-only): {opt_out_hosts}")
-        logger.info(f"Failed updates: {failed_updates}")
-        logger.info(f"Reverted to snapshot: {reverted_hosts}")
+        logger.info(
+            "\nUPDATE SUMMARY:\n"
+            "Total hosts processed: %s\n"
+            "Successfully updated: %s\n"
+            "No updates needed: %s\n"
+            "Opt-out hosts (check-only): %s\n"
+            "Failed updates: %s\n"
+            "Reverted to snapshot: %s",
+            total_hosts,
+            successful_updates,
+            no_updates_needed,
+            opt_out_hosts,
+            failed_updates,
+            reverted_hosts,
+        )
         if critical_failures > 0:
-            logger.critical(f"CRITICAL: Revert failures: {critical_failures}")
+            logger.critical("CRITICAL: Revert failures: %s", critical_failures)
 
         # Send email report with update results
         logger.info("Sending automated update email report...")
@@ -380,7 +427,7 @@ def update(ctx, parallel, timeout, dry_run):
         return 1 if critical_failures > 0 else 0
 
     except Exception as e:
-        logger.error(f"Application error: {e}")
+        logger.error("Application error: %s", e)
         return 1
 
 
@@ -404,41 +451,43 @@ def init(config_file, inventory_file, vm_mapping_file):
         # Create example config
         if Path(config_file).exists():
             if not click.confirm(f"{config_file} already exists. Overwrite?"):
-                logger.info(f"Skipped creating {config_file}")
+                logger.info("Skipped creating %s", config_file)
             else:
                 create_example_config(config_file)
-                logger.info(f"Created example configuration: {config_file}")
+                logger.info("Created example configuration: %s", config_file)
         else:
             create_example_config(config_file)
-            logger.info(f"Created example configuration: {config_file}")
+            logger.info("Created example configuration: %s", config_file)
 
         # Create example inventory
         if Path(inventory_file).exists():
             if not click.confirm(f"{inventory_file} already exists. Overwrite?"):
-                logger.info(f"Skipped creating {inventory_file}")
+                logger.info("Skipped creating %s", inventory_file)
             else:
                 create_example_inventory(inventory_file)
-                logger.info(f"Created example inventory: {inventory_file}")
+                logger.info("Created example inventory: %s", inventory_file)
         else:
             create_example_inventory(inventory_file)
-            logger.info(f"Created example inventory: {inventory_file}")
+            logger.info("Created example inventory: %s", inventory_file)
 
         # Create example VM mapping
         if Path(vm_mapping_file).exists():
             if not click.confirm(f"{vm_mapping_file} already exists. Overwrite?"):
-                logger.info(f"Skipped creating {vm_mapping_file}")
+                logger.info("Skipped creating %s", vm_mapping_file)
             else:
                 create_example_vm_mapping(vm_mapping_file)
-                logger.info(f"Created example VM mapping: {vm_mapping_file}")
+                logger.info("Created example VM mapping: %s", vm_mapping_file)
         else:
             create_example_vm_mapping(vm_mapping_file)
-            logger.info(f"Created example VM mapping: {vm_mapping_file}")
+            logger.info("Created example VM mapping: %s", vm_mapping_file)
 
         logger.info("\nNext steps:")
-        logger.info(f"1. Copy {config_file} to config.toml and edit with your settings")
-        logger.info(f"2. Copy {inventory_file} to inventory.yml and add your hosts")
         logger.info(
-            f"3. Copy {vm_mapping_file} to vm_mapping.toml and map hosts to VMs"
+            "1. Copy %s to config.toml and edit with your settings", config_file
+        )
+        logger.info("2. Copy %s to inventory.yml and add your hosts", inventory_file)
+        logger.info(
+            "3. Copy %s to vm_mapping.toml and map hosts to VMs", vm_mapping_file
         )
         logger.info("4. Run 'miniupdate check --dry-run' to test checking updates")
         logger.info("5. Run 'miniupdate update --dry-run' to test automated updates")
@@ -447,7 +496,7 @@ def init(config_file, inventory_file, vm_mapping_file):
         )
 
     except Exception as e:
-        logger.error(f"Failed to create example files: {e}")
+        logger.error("Failed to create example files: %s", e)
         return 1
 
 
@@ -457,31 +506,31 @@ def test_config(ctx):
     """Test configuration file and connectivity."""
     try:
         config = Config(ctx.obj.get("config_path"))
-        logger.info(f"✓ Configuration loaded from {config.config_path}")
+        logger.info("✓ Configuration loaded from %s", config.config_path)
 
         # Test SMTP config
         smtp_config = config.smtp_config
-        logger.info(f"✓ SMTP configuration loaded")
+        logger.info("✓ SMTP configuration loaded")
         logger.info(
-            f"  Server: {smtp_config['smtp_server']}:{smtp_config['smtp_port']}"
+            "  Server: %s:%s", smtp_config["smtp_server"], smtp_config["smtp_port"]
         )
-        logger.info(f"  From: {smtp_config['from_email']}")
-        logger.info(f"  To: {smtp_config['to_email']}")
+        logger.info("  From: %s", smtp_config["from_email"])
+        logger.info("  To: %s", smtp_config["to_email"])
 
         # Test inventory
         inventory_parser = InventoryParser(config.inventory_path)
         hosts = inventory_parser.parse()
-        logger.info(f"✓ Inventory loaded: {len(hosts)} hosts")
+        logger.info("✓ Inventory loaded: %s hosts", len(hosts))
 
         for host in hosts[:5]:  # Show first 5 hosts
-            logger.info(f"  - {host.name} ({host.hostname}:{host.port})")
+            logger.info("  - %s (%s:%s)", host.name, host.hostname, host.port)
         if len(hosts) > 5:
-            logger.info(f"  ... and {len(hosts) - 5} more")
+            logger.info("  ... and %s more", len(hosts) - 5)
 
         logger.info("Configuration appears valid!")
 
     except Exception as e:
-        logger.error(f"Configuration error: {e}")
+        logger.error("Configuration error: %s", e)
         return 1
 
 
@@ -493,7 +542,7 @@ def main():
         logger.info("Interrupted by user")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         sys.exit(1)
 
 
@@ -4,13 +4,31 @@ OS detection for miniupdate.
 Detects the operating system and distribution of remote hosts.
 """
 
+import json
 import logging
-from typing import Optional, Dict, Tuple
-
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Dict, Tuple
+
+from .inventory import Host
 from .ssh_manager import SSHConnection
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_OS_INFO_CACHE_FILE = "~/.cache/miniupdate/os_info.json"
+
+# OSInfo attributes persisted in the OS info cache
+_OS_INFO_FIELDS = (
+    "os_family",
+    "distribution",
+    "version",
+    "package_manager",
+    "architecture",
+)
+
 
 class OSInfo:
     """Container for OS information."""
@@ -39,22 +57,119 @@ class OSInfo:
         )
 
 
+class OSInfoCache:
+    """Persists detected OS information between runs, keyed by host."""
+
+    def __init__(self, settings: Dict[str, Any]):
+        """
+        Initialize OS info cache.
+
+        Args:
+            settings: General settings dictionary. os_info_cache_days sets how
+                long entries stay valid (0 disables the cache) and
+                os_info_cache_file overrides the cache location.
+        """
+        self.max_age = float(settings.get("os_info_cache_days", 1)) * 86400
+        self.path = Path(
+            os.path.expanduser(
+                settings.get("os_info_cache_file", _DEFAULT_OS_INFO_CACHE_FILE)
+            )
+        )
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @staticmethod
+    def _key(host: Host) -> str:
+        return f"{host.name}:{host.hostname}"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the cache file on first use. Caller must hold the lock."""
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+            self._entries = entries if isinstance(entries, dict) else {}
+        return self._entries
+
+    def get(self, host: Host) -> Optional[OSInfo]:
+        """
+        Look up cached OS information for a host.
+
+        Args:
+            host: Host to look up
+
+        Returns:
+            OSInfo if a fresh entry exists, None otherwise
+        """
+        if self.max_age <= 0:
+            return None
+
+        with self._lock:
+            entry = self._load().get(self._key(host))
+
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - entry.get("mtime", 0) > self.max_age:
+            return None
+
+        try:
+            return OSInfo(**{field: entry[field] for field in _OS_INFO_FIELDS})
+        except KeyError:
+            return None
+
+    def put(self, host: Host, os_info: OSInfo) -> None:
+        """
+        Store OS information for a host and write the cache file.
+
+        Args:
+            host: Host the information belongs to
+            os_info: Detected OS information
+        """
+        if self.max_age <= 0:
+            return
+
+        entry = {field: getattr(os_info, field) for field in _OS_INFO_FIELDS}
+        entry["mtime"] = time.time()
+
+        with self._lock:
+            entries = self._load()
+            entries[self._key(host)] = entry
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning("Failed to write OS info cache %s: %s", self.path, e)
+
+
 class OSDetector:
     """Detects operating system information on remote hosts."""
 
-    # Package manager detection commands
+    # Package manager detection commands, most common first; the fallback
+    # scan picks the first one found
     PACKAGE_MANAGERS = {
         "apt": ["/usr/bin/apt", "/usr/bin/apt-get"],
-        "yum": ["/usr/bin/yum", "/bin/yum"],
         "dnf": ["/usr/bin/dnf", "/bin/dnf"],
+        "yum": ["/usr/bin/yum", "/bin/yum"],
         "zypper": ["/usr/bin/zypper"],
         "pacman": ["/usr/bin/pacman"],
         "apk": ["/sbin/apk"],
+        "brew": ["/usr/local/bin/brew", "/opt/homebrew/bin/brew"],  # macOS
         "pkg": ["/usr/sbin/pkg"],  # FreeBSD
         "pkg_add": ["/usr/sbin/pkg_add"],  # OpenBSD
-        "brew": ["/usr/local/bin/brew", "/opt/homebrew/bin/brew"],  # macOS
     }
 
+    # Prints the name of every package manager with an executable on the host
+    _PM_PROBE_COMMAND = "; ".join(
+        f"[ -x {command_path} ] && echo {pm_name}"
+        for pm_name, command_paths in PACKAGE_MANAGERS.items()
+        for command_path in command_paths
+    )
+
     # OS family detection patterns
     OS_PATTERNS = {
         "ubuntu": ("linux", "apt"),
@@ -76,8 +191,47 @@ class OSDetector:
         "macos": ("darwin", "brew"),
     }
 
-    def __init__(self, connection: SSHConnection):
+    # Single alternation over OS_PATTERNS keys, replacing a scan of each key
+    _OS_PATTERN_RE = re.compile("|".join(map(re.escape, OS_PATTERNS)))
+
+    # Distribution name fragments and their normalized names
+    _DISTRIBUTION_ALIASES = {
+        "red hat": "rhel",
+        "redhat": "rhel",
+        "centos": "centos",
+        "ubuntu": "ubuntu",
+        "linuxmint": "linuxmint",
+        "linux mint": "linuxmint",
+        "debian": "debian",
+        "fedora": "fedora",
+        "opensuse": "opensuse",
+        "suse": "opensuse",
+        "arch": "arch",
+        "manjaro": "manjaro",
+        "alpine": "alpine",
+        "freebsd": "freebsd",
+        "openbsd": "openbsd",
+        "darwin": "macos",
+        "macos": "macos",
+    }
+    _DISTRIBUTION_RE = re.compile("|".join(map(re.escape, _DISTRIBUTION_ALIASES)))
+
+    # Markers separating the sections of the combined OS info command output
+    _OS_RELEASE_MARKER = "___MINIUPDATE_OS_RELEASE___"
+    _LSB_MARKER = "___MINIUPDATE_LSB___"
+
+    # uname, os-release and lsb_release gathered in a single round-trip
+    _OS_INFO_COMMAND = (
+        f"uname -a; echo {_OS_RELEASE_MARKER}; "
+        f"cat /etc/os-release 2>/dev/null; echo {_LSB_MARKER}; "
+        "lsb_release -a 2>/dev/null || true"
+    )
+
+    def __init__(self, connection: SSHConnection, cache: Optional[OSInfoCache] = None):
         self.connection = connection
+        self.cache = cache
+        # Package manager name -> whether it is installed on this host
+        self._pm_cache: Dict[str, bool] = {}
 
     def detect_os(self) -> Optional[OSInfo]:
         """
@@ -86,11 +240,16 @@ class OSDetector:
         Returns:
             OSInfo object with detected information, or None if detection fails
         """
+        host = self.connection.host
+        if self.cache:
+            os_info = self.cache.get(host)
+            if os_info:
+                logger.info("Using cached OS info for %s: %s", host.name, os_info)
+                return os_info
+
         try:
             # Get basic system information
-            uname_info = self._get_uname_info()
-            os_release_info = self._get_os_release_info()
-            lsb_info = self._get_lsb_info()
+            uname_info, os_release_info, lsb_info = self._get_system_info()
 
             # Determine OS family and distribution
             os_family, distribution, version = self._parse_os_info(
@@ -111,20 +270,40 @@ class OSDetector:
                 architecture=architecture,
             )
 
-            logger.info("Detected OS on %s: %s", self.connection.host.name, os_info)
+            logger.info("Detected OS on %s: %s", host.name, os_info)
+            if self.cache and package_manager != "unknown":
+                self.cache.put(host, os_info)
             return os_info
 
         except Exception as e:
-            logger.error("Failed to detect OS on %s: %s", self.connection.host.name, e)
+            logger.error("Failed to detect OS on %s: %s", host.name, e)
             return None
 
-    def _get_uname_info(self) -> Dict[str, str]:
-        """Get uname information."""
-        exit_code, stdout, _stderr = self.connection.execute_command("uname -a")
+    def _get_system_info(
+        self,
+    ) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+        """Get uname, os-release and LSB information with one command."""
+        exit_code, stdout, _stderr = self.connection.execute_command(
+            self._OS_INFO_COMMAND
+        )
         if exit_code != 0:
+            return {}, {}, {}
+
+        uname_output, _, rest = stdout.partition(self._OS_RELEASE_MARKER)
+        os_release_output, _, lsb_output = rest.partition(self._LSB_MARKER)
+
+        return (
+            self._parse_uname_info(uname_output),
+            self._parse_os_release_info(os_release_output),
+            self._parse_lsb_info(lsb_output),
+        )
+
+    def _parse_uname_info(self, output: str) -> Dict[str, str]:
+        """Parse uname -a output."""
+        uname_output = output.strip()
+        if not uname_output:
             return {}
 
-        uname_output = stdout.strip()
         parts = uname_output.split()
 
         return {
@@ -136,16 +315,13 @@ class OSDetector:
             "full": uname_output,
         }
 
-    def _get_os_release_info(self) -> Dict[str, str]:
-        """Get information from /etc/os-release."""
-        exit_code, stdout, _stderr = self.connection.execute_command(
-            "cat /etc/os-release 2>/dev/null || true"
-        )
-        if exit_code != 0 or not stdout.strip():
+    def _parse_os_release_info(self, output: str) -> Dict[str, str]:
+        """Parse /etc/os-release contents."""
+        if not output.strip():
             return {}
 
         os_release = {}
-        for line in stdout.strip().split("\n"):
+        for line in output.strip().split("\n"):
             if "=" in line:
                 key, value = line.split("=", 1)
                 # Remove quotes
@@ -154,16 +330,13 @@ class OSDetector:
 
         return os_release
 
-    def _get_lsb_info(self) -> Dict[str, str]:
-        """Get LSB information."""
-        exit_code, stdout, _stderr = self.connection.execute_command(
-            "lsb_release -a 2>/dev/null || true"
-        )
-        if exit_code != 0 or not stdout.strip():
+    def _parse_lsb_info(self, output: str) -> Dict[str, str]:
+        """Parse lsb_release -a output."""
+        if not output.strip():
             return {}
 
         lsb_info = {}
-        for line in stdout.strip().split("\n"):
+        for line in output.strip().split("\n"):
             if ":" in line:
                 key, value = line.split(":", 1)
                 lsb_info[key.strip()] = value.strip()
@@ -215,10 +388,9 @@ class OSDetector:
                 version = uname_info.get("kernel_release", "unknown")
 
         # Determine OS family from distribution
-        for pattern, (family, _) in self.OS_PATTERNS.items():
-            if pattern in distribution.lower():
-                os_family = family
-                break
+        match = self._OS_PATTERN_RE.search(distribution.lower())
+        if match:
+            os_family = self.OS_PATTERNS[match.group()][0]
 
         # Clean up distribution name
         distribution = self._normalize_distribution_name(distribution)
@@ -234,47 +406,24 @@ class OSDetector:
         distribution = distribution.lower().strip()
 
         # Handle common variations
-        if "red hat" in distribution or "redhat" in distribution:
-            return "rhel"
-        if "centos" in distribution:
-            return "centos"
-        if "ubuntu" in distribution:
-            return "ubuntu"
-        if (
-            "linuxmint" in distribution
-            or "linux mint" in distribution
-            or distribution == "mint"
-        ):
+        if distribution == "mint":
             return "linuxmint"
-        if "debian" in distribution:
-            return "debian"
-        if "fedora" in distribution:
-            return "fedora"
-        if "opensuse" in distribution or "suse" in distribution:
-            return "opensuse"
-        if "arch" in distribution:
-            return "arch"
-        if "manjaro" in distribution:
-            return "manjaro"
-        if "alpine" in distribution:
-            return "alpine"
-        if "freebsd" in distribution:
-            return "freebsd"
-        if "openbsd" in distribution:
-            return "openbsd"
-        if "darwin" in distribution or "macos" in distribution:
-            return "macos"
+
+        match = self._DISTRIBUTION_RE.search(distribution)
+        if match:
+            return self._DISTRIBUTION_ALIASES[match.group()]
 
         return distribution
 
     def _detect_package_manager(self, distribution: str) -> str:
         """Detect package manager based on distribution and available commands."""
         # First try based on known distribution patterns
-        for pattern, (_, default_pm) in self.OS_PATTERNS.items():
-            if pattern in distribution.lower():
-                # Verify the package manager exists
-                if self._check_package_manager_exists(default_pm):
-                    return default_pm
+        match = self._OS_PATTERN_RE.search(distribution.lower())
+        if match:
+            default_pm = self.OS_PATTERNS[match.group()][1]
+            # Verify the package manager exists
+            if self._check_package_manager_exists(default_pm):
+                return default_pm
 
         # Fallback: check for available package managers
         for pm_name, _commands in self.PACKAGE_MANAGERS.items():
@@ -288,12 +437,21 @@ class OSDetector:
         if pm_name not in self.PACKAGE_MANAGERS:
             return False
 
-        for command_path in self.PACKAGE_MANAGERS[pm_name]:
-            exit_code, _, _ = self.connection.execute_command(f"test -x {command_path}")
-            if exit_code == 0:
-                return True
+        if not self._pm_cache:
+            self._probe_package_managers()
 
-        return False
+        return self._pm_cache[pm_name]
+
+    def _probe_package_managers(self) -> None:
+        """Check every known package manager in a single remote command."""
+        # The exit status only reflects the last test, so rely on stdout alone
+        _exit_code, stdout, _stderr = self.connection.execute_command(
+            self._PM_PROBE_COMMAND
+        )
+        found = set(stdout.split())
+        self._pm_cache = {
+            pm_name: pm_name in found for pm_name in self.PACKAGE_MANAGERS
+        }
 
     def _get_architecture(self, uname_info: Dict[str, str]) -> str:
         """Get system architecture."""
@@ -4,19 +4,86 @@ Package manager interfaces for miniupdate.
 Provides unified interface for checking updates across different package managers.
 """
 
+import functools
 import re
 import logging
+import shlex
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterable, Tuple, Optional, Type
 from .ssh_manager import SSHConnection
 from .os_detector import OSInfo
 
 logger = logging.getLogger(__name__)
 
+# Output parsers, compiled once rather than looked up per line
+# apt list --upgradable: package/repo version arch [upgradable from: old_version]
+_APT_LINE_RE = re.compile(
+    r"^([^/]+)/(\S+)\s+(\S+)\s+(\S+)(?:\s+\[upgradable from:\s+([^\]]+)\])?"
+)
+_APT_UPGRADABLE_FROM = "[upgradable from: "
+# apt suites whose packages count as security updates, e.g. jammy-security
+_APT_SECURITY_REPO_RE = re.compile(r"-(?:security|updates)")
+# pkg version -vL=: "needs updating (port has 1.2.3)"
+_PKG_PORT_VERSION_RE = re.compile(r"port has ([^)]+)")
+# pkg_add -u -n: "Update to package-version"
+_PKG_ADD_UPDATE_RE = re.compile(r"update to (\S+)", re.IGNORECASE)
+
+# Separates yum/dnf check-update output from the security-only listing in the
+# combined query; followed on the same line by check-update's exit status
+_RPM_SECURITY_MARKER = "___MINIUPDATE_SECURITY___"
+
+# Written to stderr when the refresh step of a combined upgrade command fails,
+# so it can be told apart from a failure of the upgrade itself
+_REFRESH_FAILED_MARKER = "miniupdate: package cache refresh failed"
+
+
+def _rpm_check_command(tool: str) -> str:
+    """Build a yum/dnf query listing all updates, then security updates if any."""
+    return (
+        f"sudo {tool} check-update --quiet; rc=$?; "
+        f"echo {_RPM_SECURITY_MARKER} $rc; "
+        f"if [ $rc -eq 100 ]; then sudo {tool} --security check-update --quiet; fi"
+    )
+
+
+def _split_rpm_check_output(stdout: str, exit_code: int) -> Tuple[int, str, str]:
+    """
+    Split the output of a combined yum/dnf query.
+
+    Args:
+        stdout: Output of the command built by _rpm_check_command
+        exit_code: Exit code of the combined command
+
+    Returns:
+        Tuple of (check-update exit code, check-update output, security output)
+    """
+    check_output, marker, rest = stdout.partition(_RPM_SECURITY_MARKER)
+    if not marker:
+        return exit_code, stdout, ""
+
+    status, _, security_output = rest.partition("\n")
+    try:
+        return int(status), check_output, security_output
+    except ValueError:
+        return exit_code, check_output, security_output
+
 
 class PackageUpdate:
     """Represents a package update."""
 
+    __slots__ = (
+        "name",
+        "current_version",
+        "available_version",
+        "repository",
+        "security",
+        "description",
+    )
+
+    _SECURITY_MARKER = " [SECURITY]"
+
     def __init__(
         self,
         name: str,
@@ -34,7 +101,7 @@ class PackageUpdate:
         self.description = description
 
     def __str__(self):
-        security_marker = " [SECURITY]" if self.security else ""
+        security_marker = self._SECURITY_MARKER if self.security else ""
         return f"{self.name}: {self.current_version} -> {self.available_version}{security_marker}"
 
     def __repr__(self):
@@ -46,12 +113,207 @@ class PackageUpdate:
         )
 
 
+def _rpm_package_name(package_arch: str) -> str:
+    """Strip the .arch suffix from a yum/dnf package column."""
+    dot = package_arch.rfind(".")
+    return package_arch[:dot] if dot >= 0 else package_arch
+
+
+def _parse_rpm_check_output(output: str) -> List[PackageUpdate]:
+    """Parse yum/dnf check-update output (both tools share the format)."""
+    updates = []
+
+    for line in output.splitlines():
+        line = line.strip()
+        if (
+            not line
+            or line.startswith("Loaded plugins")
+            or line.startswith("Loading mirror")
+        ):
+            continue
+
+        parts = line.split()
+        if len(parts) >= 3:
+            package_arch = parts[0]
+            available_version = parts[1]
+            repository = parts[2]
+
+            # Placeholder until _fill_rpm_current_versions queries rpm
+            current_version = "installed"
+
+            update = PackageUpdate(
+                name=_rpm_package_name(package_arch),
+                current_version=current_version,
+                available_version=available_version,
+                repository=repository,
+            )
+            updates.append(update)
+
+    return updates
+
+
+def _mark_rpm_security_updates(updates: List[PackageUpdate], output: str):
+    """Mark updates listed in yum/dnf --security check-update output."""
+    security_packages = set()
+    for line in output.splitlines():
+        parts = line.split()
+        if parts:
+            security_packages.add(_rpm_package_name(parts[0]))
+
+    # Mark matching updates as security updates
+    for update in updates:
+        if update.name in security_packages:
+            update.security = True
+
+
+def _fill_rpm_current_versions(connection: SSHConnection, updates: List[PackageUpdate]):
+    """Replace the "installed" placeholder with versions from one rpm query."""
+    names = sorted({update.name for update in updates})
+    if not names:
+        return
+
+    try:
+        _exit_code, stdout, _stderr = connection.execute_command(
+            "rpm -q --qf '%{NAME} %{VERSION}-%{RELEASE}\\n' "
+            + " ".join(shlex.quote(name) for name in names),
+            timeout=60,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to query installed package versions: {e}")
+        return
+
+    # rpm exits non-zero if any name is not installed but still prints the
+    # rest; "package foo is not installed" lines have more than two fields
+    versions = {}
+    for line in stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            versions[parts[0]] = parts[1]
+
+    for update in updates:
+        update.current_version = versions.get(update.name, update.current_version)
+
+
+def _cached_check_updates(method):
+    """
+    Serve check_updates from the shared cache while younger than cache_ttl.
+
+    Only successful checks are stored; a failed one (reported through
+    _check_failed) must not hide pending updates for the rest of the TTL.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self) -> List[PackageUpdate]:
+        self._check_failed = False
+        if self.cache_ttl <= 0:
+            return method(self)
+
+        key = self._update_cache_key()
+        with self._update_cache_lock:
+            cached = self._update_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.cache_ttl:
+            logger.debug("Using cached update list for %s", key[0])
+            return list(cached[1])
+
+        updates = method(self)
+        if not self._check_failed:
+            with self._update_cache_lock:
+                self._update_cache[key] = (time.monotonic(), list(updates))
+        return updates
+
+    return wrapper
+
+
+def _invalidates_update_cache(method):
+    """Drop the host's cached update list once the wrapped method has run."""
+
+    @functools.wraps(method)
+    def wrapper(self):
+        try:
+            return method(self)
+        finally:
+            with self._update_cache_lock:
+                self._update_cache.pop(self._update_cache_key(), None)
+
+    return wrapper
+
+
+# Package manager classes keyed by OSInfo.package_manager name
+_PACKAGE_MANAGERS: Dict[str, Type["PackageManager"]] = {}
+
+
+def register_package_manager(name: str):
+    """Class decorator registering a PackageManager for get_package_manager."""
+
+    def decorator(cls: Type["PackageManager"]) -> Type["PackageManager"]:
+        _PACKAGE_MANAGERS[name] = cls
+        return cls
+
+    return decorator
+
+
 class PackageManager(ABC):
     """Abstract base class for package managers."""
 
-    def __init__(self, connection: SSHConnection, os_info: OSInfo):
+    # Shell commands used by refresh_cache/apply_updates; every subclass must
+    # set _UPGRADE_COMMAND, _REFRESH_COMMAND is optional
+    _REFRESH_COMMAND: Optional[str] = None
+    _UPGRADE_COMMAND: str
+
+    # (host name, hostname, manager class) -> (monotonic time, updates),
+    # shared by every instance so repeated checks of a host can reuse it
+    _update_cache: Dict[Tuple[str, str, str], Tuple[float, List[PackageUpdate]]] = {}
+    _update_cache_lock = threading.Lock()
+
+    def __init__(
+        self,
+        connection: SSHConnection,
+        os_info: OSInfo,
+        cache_ttl: float = 0,
+        refresh_ttl: float = 300,
+    ):
+        """
+        Initialize package manager.
+
+        Args:
+            connection: SSH connection to the host
+            os_info: Detected OS information
+            cache_ttl: Seconds a check_updates result may be reused for the
+                same host; 0 disables the cache
+            refresh_ttl: Seconds after a successful refresh_cache during which
+                apply_updates skips refreshing again
+        """
         self.connection = connection
         self.os_info = os_info
+        self.cache_ttl = cache_ttl
+        self.refresh_ttl = refresh_ttl
+        self._last_refresh: Optional[float] = None
+        # Set by check_updates when it returns [] because the check failed
+        self._check_failed = False
+
+    def _update_cache_key(self) -> Tuple[str, str, str]:
+        host = self.connection.host
+        return (host.name, host.hostname, type(self).__name__)
+
+    def _upgrade_command(self) -> str:
+        """Upgrade command, preceded by a cache refresh unless one ran recently."""
+        if self._REFRESH_COMMAND is None or (
+            self._last_refresh is not None
+            and time.monotonic() - self._last_refresh < self.refresh_ttl
+        ):
+            return self._UPGRADE_COMMAND
+        return (
+            f"{{ {self._REFRESH_COMMAND}; }} || "
+            f"{{ rc=$?; echo '{_REFRESH_FAILED_MARKER}' >&2; exit $rc; }}; "
+            f"{self._UPGRADE_COMMAND}"
+        )
+
+    @staticmethod
+    def _failed_upgrade_step(stderr: str, upgrade_step: str) -> str:
+        """Name the step of an _upgrade_command() run that failed."""
+        if _REFRESH_FAILED_MARKER in stderr:
+            return "Package cache refresh"
+        return upgrade_step
 
     @abstractmethod
     def check_updates(self) -> List[PackageUpdate]:
@@ -74,16 +336,21 @@ class PackageManager(ABC):
         pass
 
 
+@register_package_manager("apt")
 class AptPackageManager(PackageManager):
     """Package manager for APT (Debian/Ubuntu)."""
 
+    _REFRESH_COMMAND = "sudo apt-get update -qq"
+    _UPGRADE_COMMAND = "sudo DEBIAN_FRONTEND=noninteractive apt-get upgrade -y"
+
     def refresh_cache(self) -> bool:
         """Refresh APT cache."""
         try:
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo apt-get update -qq", timeout=300
+                self._REFRESH_COMMAND, timeout=300
             )
             if exit_code == 0:
+                self._last_refresh = time.monotonic()
                 return True
             else:
                 logger.error(
@@ -94,53 +361,68 @@ class AptPackageManager(PackageManager):
             logger.error(f"Failed to refresh APT cache: {e}")
             return False
 
+    @_cached_check_updates
     def check_updates(self) -> List[PackageUpdate]:
         """Check for APT package updates."""
         updates = []
 
         try:
-            # Get list of upgradable packages
-            exit_code, stdout, stderr = self.connection.execute_command(
-                'sudo apt list --upgradable 2>/dev/null | grep -v "WARNING"',
-                timeout=120,
+            # Get list of upgradable packages; apt's CLI stability warning
+            # goes to stderr, so stdout only carries the listing
+            stream = self.connection.execute_command_stream(
+                "sudo apt list --upgradable", timeout=120
             )
 
-            if exit_code != 0:
-                logger.warning(f"APT list command failed: {stderr}")
-                return updates
-
-            # Parse output
-            for line in stdout.strip().split("\n"):
-                if not line.strip() or "Listing..." in line:
+            # Parse lines as they arrive; results only count once the
+            # command has finished successfully
+            parsed = []
+            for line in stream:
+                if not line.strip() or line.startswith("Listing..."):
                     continue
 
                 update = self._parse_apt_line(line)
                 if update:
-                    updates.append(update)
+                    parsed.append(update)
+
+            if stream.exit_code != 0:
+                logger.warning(f"APT list command failed: {stream.stderr}")
+                self._check_failed = True
+                return []
 
             # Check for security updates
-            self._mark_security_updates(updates)
+            self._mark_security_updates(parsed)
+            updates = parsed
 
         except Exception as e:
             logger.error(f"Failed to check APT updates: {e}")
+            self._check_failed = True
+            return []
 
         return updates
 
     def _parse_apt_line(self, line: str) -> Optional[PackageUpdate]:
         """Parse a single line from apt list --upgradable."""
         # Format: package/repo version arch [upgradable from: old_version]
-        match = re.match(
-            r"^([^/]+)/([^\s]+)\s+([^\s]+)\s+([^\s]+)(?:\s+\[upgradable from:\s+([^\]]+)\])?",
-            line,
-        )
-
-        if not match:
-            return None
-
-        package_name = match.group(1)
-        repository = match.group(2)
-        available_version = match.group(3)
-        current_version = match.group(5) if match.group(5) else "unknown"
+        package_name, sep, rest = line.partition("/")
+        fields = rest.split(None, 3)
+        if sep and package_name and len(fields) >= 3 and not rest[:1].isspace():
+            # Fast path for the fixed, whitespace-delimited layout
+            repository, available_version = fields[0], fields[1]
+            current_version = "unknown"
+            if len(fields) == 4 and fields[3].startswith(_APT_UPGRADABLE_FROM):
+                end = fields[3].find("]")
+                old_version = fields[3][len(_APT_UPGRADABLE_FROM) : end].strip()
+                if end > 0 and old_version:
+                    current_version = old_version
+        else:
+            match = _APT_LINE_RE.match(line)
+            if not match:
+                return None
+
+            package_name = match.group(1)
+            repository = match.group(2)
+            available_version = match.group(3)
+            current_version = match.group(5) if match.group(5) else "unknown"
 
         return PackageUpdate(
             name=package_name,
@@ -151,31 +433,27 @@ class AptPackageManager(PackageManager):
 
     def _mark_security_updates(self, updates: List[PackageUpdate]):
         """Mark security updates by checking security repository."""
-        security_repos = ["-security", "-updates"]
-
         for update in updates:
-            if any(sec_repo in update.repository for sec_repo in security_repos):
+            if _APT_SECURITY_REPO_RE.search(update.repository):
                 update.security = True
 
+    @_invalidates_update_cache
     def apply_updates(self) -> tuple[bool, Optional[str]]:
         """Apply all available APT updates."""
         try:
-            # Update package cache first
-            if not self.refresh_cache():
-                logger.error("Failed to refresh package cache before applying updates")
-                return False, "Failed to refresh package cache before applying updates"
-
-            # Apply updates non-interactively
+            # Apply updates non-interactively, refreshing the package cache
+            # first in the same round-trip unless it was refreshed recently
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo DEBIAN_FRONTEND=noninteractive apt-get upgrade -y",
-                timeout=1800,  # 30 minutes for updates
+                self._upgrade_command(),
+                timeout=2100,  # 5 minutes for the refresh, 30 for updates
             )
 
             if exit_code == 0:
                 logger.info("Successfully applied APT updates")
                 return True, None
             else:
-                error_output = f"APT upgrade failed with exit code {exit_code}\n"
+                step = self._failed_upgrade_step(stderr, "APT upgrade")
+                error_output = f"{step} failed with exit code {exit_code}\n"
                 error_output += f"STDOUT:\n{stdout}\n" if stdout.strip() else ""
                 error_output += f"STDERR:\n{stderr}\n" if stderr.strip() else ""
                 logger.error(f"Failed to apply APT updates: {stderr}")
@@ -187,16 +465,21 @@ class AptPackageManager(PackageManager):
             return False, error_msg
 
 
+@register_package_manager("yum")
 class YumPackageManager(PackageManager):
     """Package manager for YUM (CentOS/RHEL 7 and older)."""
 
+    _REFRESH_COMMAND = "sudo yum clean all && sudo yum makecache fast"
+    _UPGRADE_COMMAND = "sudo yum update -y"
+
     def refresh_cache(self) -> bool:
         """Refresh YUM cache."""
         try:
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo yum clean all && sudo yum makecache fast", timeout=300
+                self._REFRESH_COMMAND, timeout=300
             )
             if exit_code == 0:
+                self._last_refresh = time.monotonic()
                 return True
             else:
                 logger.error(
@@ -207,113 +490,69 @@ class YumPackageManager(PackageManager):
             logger.error(f"Failed to refresh YUM cache: {e}")
             return False
 
+    @_cached_check_updates
     def check_updates(self) -> List[PackageUpdate]:
         """Check for YUM package updates."""
         updates = []
 
         try:
-            # Get list of available updates
+            # List available updates and, if there are any, the security
+            # subset in one round-trip
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo yum check-update --quiet", timeout=120
+                _rpm_check_command("yum"), timeout=240
+            )
+            security_exit_code = exit_code
+            exit_code, stdout, security_output = _split_rpm_check_output(
+                stdout, exit_code
             )
 
             # yum check-update returns 100 if updates are available, 0 if none
             if exit_code not in [0, 100]:
                 logger.warning(f"YUM check-update failed: {stderr}")
+                self._check_failed = True
                 return updates
 
             if exit_code == 100:  # Updates available
                 updates = self._parse_yum_output(stdout)
-                self._mark_security_updates(updates)
+                if security_exit_code == 100:  # Security updates available
+                    self._mark_security_updates(updates, security_output)
+                self._fill_current_versions(updates)
 
         except Exception as e:
             logger.error(f"Failed to check YUM updates: {e}")
+            self._check_failed = True
 
         return updates
 
     def _parse_yum_output(self, output: str) -> List[PackageUpdate]:
         """Parse YUM check-update output."""
-        updates = []
+        return _parse_rpm_check_output(output)
 
-        for line in output.strip().split("\n"):
-            line = line.strip()
-            if (
-                not line
-                or line.startswith("Loaded plugins")
-                or line.startswith("Loading mirror")
-            ):
-                continue
-
-            parts = line.split()
-            if len(parts) >= 3:
-                package_arch = parts[0]
-                available_version = parts[1]
-                repository = parts[2]
-
-                # Extract package name (remove .arch suffix)
-                if "." in package_arch:
-                    package_name = package_arch.rsplit(".", 1)[0]
-                else:
-                    package_name = package_arch
-
-                # Get current version (this is simplified - would need rpm query for exact version)
-                current_version = "installed"
-
-                update = PackageUpdate(
-                    name=package_name,
-                    current_version=current_version,
-                    available_version=available_version,
-                    repository=repository,
-                )
-                updates.append(update)
+    def _mark_security_updates(self, updates: List[PackageUpdate], output: str):
+        """Mark security updates from yum --security check-update output."""
+        _mark_rpm_security_updates(updates, output)
 
-        return updates
-
-    def _mark_security_updates(self, updates: List[PackageUpdate]):
-        """Mark security updates using yum security plugin."""
-        try:
-            exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo yum --security check-update --quiet", timeout=120
-            )
-
-            if exit_code == 100:  # Security updates available
-                security_packages = set()
-                for line in stdout.strip().split("\n"):
-                    parts = line.strip().split()
-                    if len(parts) >= 1:
-                        package_arch = parts[0]
-                        if "." in package_arch:
-                            package_name = package_arch.rsplit(".", 1)[0]
-                        else:
-                            package_name = package_arch
-                        security_packages.add(package_name)
-
-                # Mark matching updates as security updates
-                for update in updates:
-                    if update.name in security_packages:
-                        update.security = True
-
-        except Exception as e:
-            logger.debug(f"Could not check YUM security updates: {e}")
+    def _fill_current_versions(self, updates: List[PackageUpdate]):
+        """Fill in installed versions with a single rpm query."""
+        _fill_rpm_current_versions(self.connection, updates)
 
+    @_invalidates_update_cache
     def apply_updates(self) -> tuple[bool, Optional[str]]:
         """Apply all available YUM updates."""
         try:
-            # Update package cache first
-            if not self.refresh_cache():
-                logger.error("Failed to refresh package cache before applying updates")
-                return False, "Failed to refresh package cache before applying updates"
-
-            # Apply updates non-interactively
+            # Apply updates non-interactively, refreshing the package cache
+            # first in the same round-trip unless it was refreshed recently
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo yum update -y", timeout=1800  # 30 minutes for updates
+                self._upgrade_command(),
+                timeout=2100,  # 5 minutes for the refresh, 30 for updates
             )
 
             if exit_code == 0:
                 logger.info("Successfully applied YUM updates")
                 return True, None
             else:
-                error_output = f"YUM update failed with exit code {exit_code}\n"
+                step = self._failed_upgrade_step(stderr, "YUM update")
+                error_output = f"{step} failed with exit code {exit_code}\n"
                 error_output += f"STDOUT:\n{stdout}\n" if stdout.strip() else ""
                 error_output += f"STDERR:\n{stderr}\n" if stderr.strip() else ""
                 logger.error(f"Failed to apply YUM updates: {stderr}")
@@ -325,16 +564,21 @@ class YumPackageManager(PackageManager):
             return False, error_msg
 
 
+@register_package_manager("dnf")
 class DnfPackageManager(PackageManager):
     """Package manager for DNF (Fedora, CentOS/RHEL 8+)."""
 
+    _REFRESH_COMMAND = "sudo dnf clean all && sudo dnf makecache"
+    _UPGRADE_COMMAND = "sudo dnf update -y"
+
     def refresh_cache(self) -> bool:
         """Refresh DNF cache."""
         try:
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo dnf clean all && sudo dnf makecache", timeout=300
+                self._REFRESH_COMMAND, timeout=300
             )
             if exit_code == 0:
+                self._last_refresh = time.monotonic()
                 return True
             else:
                 logger.error(
@@ -345,80 +589,69 @@ class DnfPackageManager(PackageManager):
             logger.error(f"Failed to refresh DNF cache: {e}")
             return False
 
+    @_cached_check_updates
     def check_updates(self) -> List[PackageUpdate]:
         """Check for DNF package updates."""
         updates = []
 
         try:
-            # Get list of available updates
+            # List available updates and, if there are any, the security
+            # subset in one round-trip
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo dnf check-update --quiet", timeout=120
+                _rpm_check_command("dnf"), timeout=240
+            )
+            security_exit_code = exit_code
+            exit_code, stdout, security_output = _split_rpm_check_output(
+                stdout, exit_code
             )
 
             # dnf check-update returns 100 if updates are available
             if exit_code not in [0, 100]:
                 logger.warning(f"DNF check-update failed: {stderr}")
+                self._check_failed = True
                 return updates
 
             if exit_code == 100:  # Updates available
                 updates = self._parse_dnf_output(stdout)
-                self._mark_security_updates(updates)
+                if security_exit_code == 100:  # Security updates available
+                    self._mark_security_updates(updates, security_output)
+                self._fill_current_versions(updates)
 
         except Exception as e:
             logger.error(f"Failed to check DNF updates: {e}")
+            self._check_failed = True
 
         return updates
 
     def _parse_dnf_output(self, output: str) -> List[PackageUpdate]:
         """Parse DNF check-update output."""
-        # DNF output format is similar to YUM
-        return YumPackageManager._parse_yum_output(self, output)
-
-    def _mark_security_updates(self, updates: List[PackageUpdate]):
-        """Mark security updates using dnf security plugin."""
-        try:
-            exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo dnf --security check-update --quiet", timeout=120
-            )
+        return _parse_rpm_check_output(output)
 
-            if exit_code == 100:  # Security updates available
-                security_packages = set()
-                for line in stdout.strip().split("\n"):
-                    parts = line.strip().split()
-                    if len(parts) >= 1:
-                        package_arch = parts[0]
-                        if "." in package_arch:
-                            package_name = package_arch.rsplit(".", 1)[0]
-                        else:
-                            package_name = package_arch
-                        security_packages.add(package_name)
-
-                # Mark matching updates as security updates
-                for update in updates:
-                    if update.name in security_packages:
-                        update.security = True
+    def _mark_security_updates(self, updates: List[PackageUpdate], output: str):
+        """Mark security updates from dnf --security check-update output."""
+        _mark_rpm_security_updates(updates, output)
 
-        except Exception as e:
-            logger.debug(f"Could not check DNF security updates: {e}")
+    def _fill_current_versions(self, updates: List[PackageUpdate]):
+        """Fill in installed versions with a single rpm query."""
+        _fill_rpm_current_versions(self.connection, updates)
 
+    @_invalidates_update_cache
     def apply_updates(self) -> tuple[bool, Optional[str]]:
         """Apply all available DNF updates."""
         try:
-            # Update package cache first
-            if not self.refresh_cache():
-                logger.error("Failed to refresh package cache before applying updates")
-                return False, "Failed to refresh package cache before applying updates"
-
-            # Apply updates non-interactively
+            # Apply updates non-interactively, refreshing the package cache
+            # first in the same round-trip unless it was refreshed recently
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo dnf update -y", timeout=1800  # 30 minutes for updates
+                self._upgrade_command(),
+                timeout=2100,  # 5 minutes for the refresh, 30 for updates
             )
 
             if exit_code == 0:
                 logger.info("Successfully applied DNF updates")
                 return True, None
             else:
-                error_output = f"DNF update failed with exit code {exit_code}\n"
+                step = self._failed_upgrade_step(stderr, "DNF update")
+                error_output = f"{step} failed with exit code {exit_code}\n"
                 error_output += f"STDOUT:\n{stdout}\n" if stdout.strip() else ""
                 error_output += f"STDERR:\n{stderr}\n" if stderr.strip() else ""
                 logger.error(f"Failed to apply DNF updates: {stderr}")
@@ -430,16 +663,21 @@ class DnfPackageManager(PackageManager):
             return False, error_msg
 
 
+@register_package_manager("zypper")
 class ZypperPackageManager(PackageManager):
     """Package manager for Zypper (openSUSE)."""
 
+    _REFRESH_COMMAND = "sudo zypper --quiet refresh"
+    _UPGRADE_COMMAND = "sudo zypper --non-interactive update"
+
     def refresh_cache(self) -> bool:
         """Refresh Zypper cache."""
         try:
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo zypper --quiet refresh", timeout=300
+                self._REFRESH_COMMAND, timeout=300
             )
             if exit_code == 0:
+                self._last_refresh = time.monotonic()
                 return True
             else:
                 logger.error(
@@ -450,31 +688,33 @@ class ZypperPackageManager(PackageManager):
             logger.error(f"Failed to refresh Zypper cache: {e}")
             return False
 
+    @_cached_check_updates
     def check_updates(self) -> List[PackageUpdate]:
         """Check for Zypper package updates."""
         updates = []
 
         try:
-            exit_code, stdout, stderr = self.connection.execute_command(
+            stream = self.connection.execute_command_stream(
                 "sudo zypper --quiet list-updates", timeout=120
             )
+            updates = self._parse_zypper_output(stream)
 
-            if exit_code != 0:
-                logger.warning(f"Zypper list-updates failed: {stderr}")
-                return updates
-
-            updates = self._parse_zypper_output(stdout)
+            if stream.exit_code != 0:
+                logger.warning(f"Zypper list-updates failed: {stream.stderr}")
+                self._check_failed = True
+                return []
 
         except Exception as e:
             logger.error(f"Failed to check Zypper updates: {e}")
+            self._check_failed = True
 
         return updates
 
-    def _parse_zypper_output(self, output: str) -> List[PackageUpdate]:
-        """Parse Zypper list-updates output."""
+    def _parse_zypper_output(self, lines: Iterable[str]) -> List[PackageUpdate]:
+        """Parse Zypper list-updates output lines."""
         updates = []
 
-        for line in output.strip().split("\n"):
+        for line in lines:
             if line.startswith("v |"):  # Update line
                 parts = [p.strip() for p in line.split("|")]
                 if len(parts) >= 5:
@@ -493,25 +733,23 @@ class ZypperPackageManager(PackageManager):
 
         return updates
 
+    @_invalidates_update_cache
     def apply_updates(self) -> tuple[bool, Optional[str]]:
         """Apply all available Zypper updates."""
         try:
-            # Update package cache first
-            if not self.refresh_cache():
-                logger.error("Failed to refresh package cache before applying updates")
-                return False, "Failed to refresh package cache before applying updates"
-
-            # Apply updates non-interactively
+            # Apply updates non-interactively, refreshing the package cache
+            # first in the same round-trip unless it was refreshed recently
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo zypper --non-interactive update",
-                timeout=1800,  # 30 minutes for updates
+                self._upgrade_command(),
+                timeout=2100,  # 5 minutes for the refresh, 30 for updates
             )
 
             if exit_code == 0:
                 logger.info("Successfully applied Zypper updates")
                 return True, None
             else:
-                error_output = f"Zypper update failed with exit code {exit_code}\n"
+                step = self._failed_upgrade_step(stderr, "Zypper update")
+                error_output = f"{step} failed with exit code {exit_code}\n"
                 error_output += f"STDOUT:\n{stdout}\n" if stdout.strip() else ""
                 error_output += f"STDERR:\n{stderr}\n" if stderr.strip() else ""
                 logger.error(f"Failed to apply Zypper updates: {stderr}")
@@ -523,16 +761,21 @@ class ZypperPackageManager(PackageManager):
             return False, error_msg
 
 
+@register_package_manager("pacman")
 class PackmanPackageManager(PackageManager):
     """Package manager for Pacman (Arch Linux)."""
 
+    _REFRESH_COMMAND = "sudo pacman -Sy"
+    _UPGRADE_COMMAND = "sudo pacman -Su --noconfirm"
+
     def refresh_cache(self) -> bool:
         """Refresh Pacman cache."""
         try:
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo pacman -Sy", timeout=300
+                self._REFRESH_COMMAND, timeout=300
             )
             if exit_code == 0:
+                self._last_refresh = time.monotonic()
                 return True
             else:
                 logger.error(
@@ -543,32 +786,33 @@ class PackmanPackageManager(PackageManager):
             logger.error(f"Failed to refresh Pacman cache: {e}")
             return False
 
+    @_cached_check_updates
     def check_updates(self) -> List[PackageUpdate]:
         """Check for Pacman package updates."""
         updates = []
 
         try:
-            exit_code, stdout, stderr = self.connection.execute_command(
+            stream = self.connection.execute_command_stream(
                 "sudo pacman -Qu", timeout=120
             )
+            updates = self._parse_pacman_output(stream)
 
-            if exit_code not in [0, 1]:  # 1 means no updates
-                logger.warning(f"Pacman query failed: {stderr}")
-                return updates
-
-            if exit_code == 0:  # Updates available
-                updates = self._parse_pacman_output(stdout)
+            if stream.exit_code not in [0, 1]:  # 1 means no updates
+                logger.warning(f"Pacman query failed: {stream.stderr}")
+                self._check_failed = True
+                return []
 
         except Exception as e:
             logger.error(f"Failed to check Pacman updates: {e}")
+            self._check_failed = True
 
         return updates
 
-    def _parse_pacman_output(self, output: str) -> List[PackageUpdate]:
-        """Parse Pacman -Qu output."""
+    def _parse_pacman_output(self, lines: Iterable[str]) -> List[PackageUpdate]:
+        """Parse Pacman -Qu output lines."""
         updates = []
 
-        for line in output.strip().split("\n"):
+        for line in lines:
             if "->" in line:
                 parts = line.split("->")
                 if len(parts) == 2:
@@ -593,24 +837,23 @@ class PackmanPackageManager(PackageManager):
 
         return updates
 
+    @_invalidates_update_cache
     def apply_updates(self) -> tuple[bool, Optional[str]]:
         """Apply all available Pacman updates."""
         try:
-            # Update package cache first
-            if not self.refresh_cache():
-                logger.error("Failed to refresh package cache before applying updates")
-                return False, "Failed to refresh package cache before applying updates"
-
-            # Apply updates non-interactively
+            # Apply updates non-interactively, refreshing the package cache
+            # first in the same round-trip unless it was refreshed recently
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo pacman -Su --noconfirm", timeout=1800  # 30 minutes for updates
+                self._upgrade_command(),
+                timeout=2100,  # 5 minutes for the refresh, 30 for updates
             )
 
             if exit_code == 0:
                 logger.info("Successfully applied Pacman updates")
                 return True, None
             else:
-                error_output = f"Pacman update failed with exit code {exit_code}\n"
+                step = self._failed_upgrade_step(stderr, "Pacman update")
+                error_output = f"{step} failed with exit code {exit_code}\n"
                 error_output += f"STDOUT:\n{stdout}\n" if stdout.strip() else ""
                 error_output += f"STDERR:\n{stderr}\n" if stderr.strip() else ""
                 logger.error(f"Failed to apply Pacman updates: {stderr}")
@@ -622,16 +865,21 @@ class PackmanPackageManager(PackageManager):
             return False, error_msg
 
 
+@register_package_manager("pkg")
 class PkgPackageManager(PackageManager):
     """Package manager for FreeBSD pkg."""
 
+    _REFRESH_COMMAND = "sudo pkg update"
+    _UPGRADE_COMMAND = "sudo pkg upgrade -y"
+
     def refresh_cache(self) -> bool:
         """Refresh pkg cache."""
         try:
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo pkg update", timeout=300
+                self._REFRESH_COMMAND, timeout=300
             )
             if exit_code == 0:
+                self._last_refresh = time.monotonic()
                 return True
             else:
                 logger.error(
@@ -642,39 +890,42 @@ class PkgPackageManager(PackageManager):
             logger.error(f"Failed to refresh pkg cache: {e}")
             return False
 
+    @_cached_check_updates
     def check_updates(self) -> List[PackageUpdate]:
         """Check for pkg package updates."""
         updates = []
 
         try:
-            exit_code, stdout, stderr = self.connection.execute_command(
+            stream = self.connection.execute_command_stream(
                 "sudo pkg version -vL=", timeout=120
             )
+            updates = self._parse_pkg_output(stream)
 
-            if exit_code != 0:
-                logger.warning(f"pkg version command failed: {stderr}")
-                return updates
-
-            updates = self._parse_pkg_output(stdout)
+            if stream.exit_code != 0:
+                logger.warning(f"pkg version command failed: {stream.stderr}")
+                self._check_failed = True
+                return []
             # FreeBSD pkg doesn't have built-in security update marking like apt
             # Would need to check against security advisories separately
 
         except Exception as e:
             logger.error(f"Failed to check pkg updates: {e}")
+            self._check_failed = True
 
         return updates
 
-    def _parse_pkg_output(self, output: str) -> List[PackageUpdate]:
-        """Parse pkg version -vL= output."""
+    def _parse_pkg_output(self, lines: Iterable[str]) -> List[PackageUpdate]:
+        """Parse pkg version -vL= output lines."""
         updates = []
 
-        for line in output.strip().split("\n"):
-            line = line.strip()
-            if not line:
+        for line in lines:
+            # Most lines are up-to-date packages; reject them before any
+            # other work
+            if "needs updating" not in line:
                 continue
 
             # Format: package-version < needs updating (port has version)
-            if "<" in line and "needs updating" in line:
+            if "<" in line:
                 # Extract package name and versions
                 parts = line.split("<")
                 if len(parts) >= 2:
@@ -693,7 +944,7 @@ class PkgPackageManager(PackageManager):
 
                     # Extract available version from right part
                     # Format: "needs updating (port has 1.2.3)"
-                    match = re.search(r"port has ([^)]+)", right_part)
+                    match = _PKG_PORT_VERSION_RE.search(right_part)
                     if match:
                         available_version = match.group(1)
                     else:
@@ -709,24 +960,23 @@ class PkgPackageManager(PackageManager):
 
         return updates
 
+    @_invalidates_update_cache
     def apply_updates(self) -> tuple[bool, Optional[str]]:
         """Apply all available pkg updates."""
         try:
-            # Update package cache first
-            if not self.refresh_cache():
-                logger.error("Failed to refresh package cache before applying updates")
-                return False, "Failed to refresh package cache before applying updates"
-
-            # Apply updates non-interactively
+            # Apply updates non-interactively, refreshing the package cache
+            # first in the same round-trip unless it was refreshed recently
             exit_code, stdout, stderr = self.connection.execute_command(
-                "sudo pkg upgrade -y", timeout=1800  # 30 minutes for updates
+                self._upgrade_command(),
+                timeout=2100,  # 5 minutes for the refresh, 30 for updates
             )
 
             if exit_code == 0:
                 logger.info("Successfully applied pkg updates")
                 return True, None
             else:
-                error_output = f"pkg upgrade failed with exit code {exit_code}\n"
+                step = self._failed_upgrade_step(stderr, "pkg upgrade")
+                error_output = f"{step} failed with exit code {exit_code}\n"
                 error_output += f"STDOUT:\n{stdout}\n" if stdout.strip() else ""
                 error_output += f"STDERR:\n{stderr}\n" if stderr.strip() else ""
                 logger.error(f"Failed to apply pkg updates: {stderr}")
@@ -738,9 +988,14 @@ class PkgPackageManager(PackageManager):
             return False, error_msg
 
 
+@register_package_manager("pkg_add")
 class PkgAddPackageManager(PackageManager):
     """Package manager for OpenBSD pkg_add."""
 
+    # OpenBSD uses doas instead of sudo by default; there is no cache to
+    # refresh, so _REFRESH_COMMAND stays unset
+    _UPGRADE_COMMAND = "doas pkg_add -u"
+
     def refresh_cache(self) -> bool:
         """Refresh pkg_add cache (not really needed for OpenBSD, but check connection)."""
         # OpenBSD pkg_add doesn't have a cache refresh like other systems
@@ -755,32 +1010,34 @@ class PkgAddPackageManager(PackageManager):
             logger.error(f"Failed to check pkg_add availability: {e}")
             return False
 
+    @_cached_check_updates
     def check_updates(self) -> List[PackageUpdate]:
         """Check for pkg_add package updates."""
         updates = []
 
         try:
             # Use pkg_add -u with -n (dry-run) to see what would be updated
-            exit_code, stdout, stderr = self.connection.execute_command(
+            stream = self.connection.execute_command_stream(
                 "doas pkg_add -u -n", timeout=120
             )
+            updates = self._parse_pkg_add_output(stream)
 
-            if exit_code != 0:
-                logger.warning(f"pkg_add check command failed: {stderr}")
-                return updates
-
-            updates = self._parse_pkg_add_output(stdout)
+            if stream.exit_code != 0:
+                logger.warning(f"pkg_add check command failed: {stream.stderr}")
+                self._check_failed = True
+                return []
 
         except Exception as e:
             logger.error(f"Failed to check pkg_add updates: {e}")
+            self._check_failed = True
 
         return updates
 
-    def _parse_pkg_add_output(self, output: str) -> List[PackageUpdate]:
-        """Parse pkg_add -u -n output."""
+    def _parse_pkg_add_output(self, lines: Iterable[str]) -> List[PackageUpdate]:
+        """Parse pkg_add -u -n output lines."""
         updates = []
 
-        for line in output.strip().split("\n"):
+        for line in lines:
             line = line.strip()
             if not line:
                 continue
@@ -820,7 +1077,7 @@ class PkgAddPackageManager(PackageManager):
                     updates.append(update)
             elif "update to" in line.lower():
                 # Format: "Update to package-version"
-                match = re.search(r"update to ([^\s]+)", line, re.IGNORECASE)
+                match = _PKG_ADD_UPDATE_RE.search(line)
                 if match:
                     package_with_version = match.group(1)
                     if "-" in package_with_version:
@@ -841,13 +1098,13 @@ class PkgAddPackageManager(PackageManager):
 
         return updates
 
+    @_invalidates_update_cache
     def apply_updates(self) -> tuple[bool, Optional[str]]:
         """Apply all available pkg_add updates."""
         try:
-            # OpenBSD uses doas instead of sudo by default
             # Apply updates with -u (update) flag
             exit_code, stdout, stderr = self.connection.execute_command(
-                "doas pkg_add -u", timeout=1800  # 30 minutes for updates
+                self._upgrade_command(), timeout=1800  # 30 minutes for updates
             )
 
             if exit_code == 0:
@@ -867,22 +1124,15 @@ class PkgAddPackageManager(PackageManager):
 
 
 def get_package_manager(
-    connection: SSHConnection, os_info: OSInfo
+    connection: SSHConnection,
+    os_info: OSInfo,
+    cache_ttl: float = 0,
+    refresh_ttl: float = 300,
 ) -> Optional[PackageManager]:
     """Get appropriate package manager instance for the OS."""
-    manager_map = {
-        "apt": AptPackageManager,
-        "yum": YumPackageManager,
-        "dnf": DnfPackageManager,
-        "zypper": ZypperPackageManager,
-        "pacman": PackmanPackageManager,
-        "pkg": PkgPackageManager,
-        "pkg_add": PkgAddPackageManager,
-    }
-
-    pm_class = manager_map.get(os_info.package_manager)
+    pm_class = _PACKAGE_MANAGERS.get(os_info.package_manager)
     if pm_class:
-        return pm_class(connection, os_info)
+        return pm_class(connection, os_info, cache_ttl, refresh_ttl)
 
     logger.warning(f"Unsupported package manager: {os_info.package_manager}")
     return None
@@ -5,8 +5,10 @@ Handles VM snapshots and management via Proxmox VE API.
 """
 
 import logging
+import random
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -14,6 +16,40 @@ from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# Sessions shared by every client talking to the same endpoint, so pooled
+# keep-alive connections outlive individual ProxmoxClient instances
+_SESSIONS: Dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+# How long (seconds) GET responses may be reused, by path suffix; the first
+# match wins and unmatched paths are never cached
+_GET_CACHE_TTLS = (
+    ("/status/current", 2.0),  # VM status
+    ("/snapshot", 10.0),  # Snapshot listing
+    ("/status", 0.5),  # Task status
+)
+
+
+def _get_session(endpoint: str) -> requests.Session:
+    """Return the shared session for an endpoint, creating it on first use."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(endpoint)
+        if session is None:
+            # Setup session with retry strategy
+            session = requests.Session()
+            retry_strategy = Retry(
+                total=3,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+            )
+            adapter = HTTPAdapter(
+                pool_connections=32, pool_maxsize=32, max_retries=retry_strategy
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSIONS[endpoint] = session
+        return session
+
 
 class ProxmoxAPIError(Exception):
     """Exception for Proxmox API errors."""
@@ -47,17 +83,12 @@ class ProxmoxClient:
         self.timeout = timeout
         self.ticket = None
         self.csrf_token = None
+        self._get_cache: Dict[Tuple[str, frozenset], Tuple[float, Dict[str, Any]]] = {}
+        self._get_cache_lock = threading.Lock()
 
-        # Setup session with retry strategy
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # Credentials are sent per request rather than stored on the shared
+        # session, so clients for different users never see each other's
+        self.session = _get_session(self.endpoint)
 
         if not verify_ssl:
             import urllib3
@@ -79,10 +110,6 @@ class ProxmoxClient:
                 self.ticket = data["ticket"]
                 self.csrf_token = data["CSRFPreventionToken"]
 
-                # Set session headers
-                self.session.headers.update({"CSRFPreventionToken": self.csrf_token})
-                self.session.cookies.set("PVEAuthCookie", self.ticket)
-
                 logger.info(
                     "Successfully authenticated to Proxmox at %s", self.endpoint
                 )
@@ -96,8 +123,42 @@ class ProxmoxClient:
             logger.error("Authentication error: %s", e)
             return False
 
+    @staticmethod
+    def _get_cache_ttl(path: str) -> float:
+        """Return how long a GET response for path may be reused."""
+        for suffix, ttl in _GET_CACHE_TTLS:
+            if path.endswith(suffix):
+                return ttl
+        return 0.0
+
+    def invalidate_cache(self, path_prefix: str = "") -> None:
+        """Drop cached GET responses for paths starting with path_prefix."""
+        with self._get_cache_lock:
+            stale = [key for key in self._get_cache if key[0].startswith(path_prefix)]
+            for key in stale:
+                del self._get_cache[key]
+
     def _api_request(
         self, method: str, path: str, data: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Make authenticated API request (idempotent GETs are briefly cached)."""
+        ttl = self._get_cache_ttl(path) if method.upper() == "GET" else 0.0
+        if ttl > 0:
+            cache_key = (path, frozenset((data or {}).items()))
+            with self._get_cache_lock:
+                cached = self._get_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < ttl:
+                return cached[1]
+
+            result = self._request(method, path, data)
+            with self._get_cache_lock:
+                self._get_cache[cache_key] = (time.monotonic(), result)
+            return result
+
+        return self._request(method, path, data)
+
+    def _request(
+        self, method: str, path: str, data: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """Make authenticated API request."""
         if not self.ticket:
@@ -105,20 +166,20 @@ class ProxmoxClient:
                 raise ProxmoxAPIError("Authentication failed")
 
         url = f"{self.endpoint}/api2/json{path}"
+        request_kwargs = {
+            "headers": {"CSRFPreventionToken": self.csrf_token},
+            "cookies": {"PVEAuthCookie": self.ticket},
+            "verify": self.verify_ssl,
+            "timeout": self.timeout,
+        }
 
         try:
             if method.upper() == "GET":
-                response = self.session.get(
-                    url, params=data, verify=self.verify_ssl, timeout=self.timeout
-                )
+                response = self.session.get(url, params=data, **request_kwargs)
             elif method.upper() == "POST":
-                response = self.session.post(
-                    url, data=data, verify=self.verify_ssl, timeout=self.timeout
-                )
+                response = self.session.post(url, data=data, **request_kwargs)
             elif method.upper() == "DELETE":
-                response = self.session.delete(
-                    url, data=data, verify=self.verify_ssl, timeout=self.timeout
-                )
+                response = self.session.delete(url, data=data, **request_kwargs)
             else:
                 raise ProxmoxAPIError(f"Unsupported HTTP method: {method}")
 
@@ -128,7 +189,7 @@ class ProxmoxClient:
                 self.ticket = None
                 if not self.authenticate():
                     raise ProxmoxAPIError("Re-authentication failed")
-                return self._api_request(method, path, data)
+                return self._request(method, path, data)
 
             if response.status_code not in [200, 201]:
                 raise ProxmoxAPIError(
@@ -181,14 +242,20 @@ class ProxmoxClient:
             vmid,
             node,
         )
-        return self._api_request("POST", path, data)
+        try:
+            return self._api_request("POST", path, data)
+        finally:
+            self.invalidate_cache(f"/nodes/{node}/qemu/{vmid}/")
 
     def delete_snapshot(self, node: str, vmid: int, snapname: str) -> Dict[str, Any]:
         """Delete VM snapshot."""
         path = f"/nodes/{node}/qemu/{vmid}/snapshot/{snapname}"
 
         logger.info("Deleting snapshot '%s' for VM %s on node %s", snapname, vmid, node)
-        return self._api_request("DELETE", path)
+        try:
+            return self._api_request("DELETE", path)
+        finally:
+            self.invalidate_cache(f"/nodes/{node}/qemu/{vmid}/")
 
     def rollback_snapshot(self, node: str, vmid: int, snapname: str) -> Dict[str, Any]:
         """Rollback VM to snapshot."""
@@ -197,7 +264,10 @@ class ProxmoxClient:
         logger.warning(
             "Rolling back VM %s on node %s to snapshot '%s'", vmid, node, snapname
         )
-        return self._api_request("POST", path)
+        try:
+            return self._api_request("POST", path)
+        finally:
+            self.invalidate_cache(f"/nodes/{node}/qemu/{vmid}/")
 
     def list_snapshots(self, node: str, vmid: int) -> List[Dict[str, Any]]:
         """List VM snapshots."""
@@ -205,12 +275,34 @@ class ProxmoxClient:
         response = self._api_request("GET", path)
         return response.get("data", [])
 
-    def wait_for_task(self, node: str, upid: str, timeout: int = 300) -> bool:
-        """Wait for a Proxmox task to complete."""
+    def wait_for_task(
+        self,
+        node: str,
+        upid: str,
+        timeout: int = 300,
+        initial_delay: float = 0.5,
+        max_delay: float = 10.0,
+        multiplier: float = 1.5,
+    ) -> bool:
+        """
+        Wait for a Proxmox task to complete.
+
+        Polls with exponential backoff and full jitter, so short tasks are
+        noticed quickly and concurrent waiters do not poll in lockstep.
+
+        Args:
+            node: Proxmox node name
+            upid: Task ID to wait for
+            timeout: Maximum time to wait in seconds
+            initial_delay: Upper bound of the first poll delay in seconds
+            max_delay: Cap on the poll delay in seconds
+            multiplier: Growth factor applied to the delay after each poll
+        """
         path = f"/nodes/{node}/tasks/{upid}/status"
 
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        deadline = time.monotonic() + timeout
+        delay = min(initial_delay, max_delay)
+        while time.monotonic() < deadline:
             try:
                 response = self._api_request("GET", path)
                 task_data = response.get("data", {})
@@ -224,12 +316,13 @@ class ProxmoxClient:
                     logger.error("Task %s failed with status: %s", upid, exitstatus)
                     return False
 
-                # Task still running
-                time.sleep(2)
-
             except Exception as e:
                 logger.warning("Error checking task status: %s", e)
-                time.sleep(2)
+
+            # Task still running (or status unavailable); back off
+            sleep_for = random.uniform(0, delay)
+            time.sleep(max(0.0, min(sleep_for, deadline - time.monotonic())))
+            delay = min(delay * multiplier, max_delay)
 
         logger.error("Task %s timed out after %s seconds", upid, timeout)
         return False
@@ -241,6 +334,7 @@ class ProxmoxClient:
         try:
             logger.info("Starting VM %s on node %s", vmid, node)
             response = self._api_request("POST", path)
+            self.invalidate_cache(f"/nodes/{node}/qemu/{vmid}/")
 
             # If response contains UPID (task ID), wait for it to complete
             if "data" in response and isinstance(response["data"], str):
@@ -260,6 +354,7 @@ class ProxmoxClient:
         try:
             logger.info("Rebooting VM %s on node %s", vmid, node)
             response = self._api_request("POST", path)
+            self.invalidate_cache(f"/nodes/{node}/qemu/{vmid}/")
 
             # If response contains UPID (task ID), wait for it to complete
             if "data" in response and isinstance(response["data"], str):
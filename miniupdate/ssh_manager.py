@@ -6,9 +6,12 @@ Handles SSH connections to remote hosts and command execution.
 
 import logging
 import os
+import select
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterator
 
 import paramiko
 
@@ -16,6 +19,77 @@ from .inventory import Host
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent SSH handshakes / commands across a host list
+_MAX_SSH_WORKERS = 32
+
+# Bytes requested per channel read while streaming command output
+_STREAM_RECV_SIZE = 32768
+
+
+class CommandStream:
+    """Iterates over a remote command's stdout lines as they arrive."""
+
+    def __init__(self, host_name: str, channel: paramiko.Channel):
+        self.host_name = host_name
+        self.channel = channel
+        self.exit_code: Optional[int] = None
+        self.stderr = ""
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Yield stdout lines without line endings.
+
+        stderr is drained as it arrives: stdout and stderr share the channel's
+        flow-control window, so leaving stderr unread could stall stdout until
+        the channel timeout. exit_code and stderr are set once the output is
+        exhausted.
+        """
+        channel = self.channel
+        timeout = channel.gettimeout()
+        stderr_chunks = []
+        pending = b""
+        try:
+            while True:
+                if channel.recv_stderr_ready():
+                    stderr_chunks.append(channel.recv_stderr(_STREAM_RECV_SIZE))
+                    continue
+
+                if not channel.recv_ready():
+                    # EOF covers both streams; stop once their buffers are empty
+                    if channel.eof_received and not (
+                        channel.recv_ready() or channel.recv_stderr_ready()
+                    ):
+                        break
+                    # The channel's fileno signals data on stdout or stderr
+                    readable, _, _ = select.select([channel], [], [], timeout)
+                    if not readable:
+                        raise socket.timeout(
+                            f"No output from {self.host_name} for {timeout}s"
+                        )
+                    continue
+
+                data = channel.recv(_STREAM_RECV_SIZE)
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b"\n")
+                for line in lines:
+                    yield line.decode("utf-8", errors="replace").rstrip("\r")
+
+            if pending:
+                yield pending.decode("utf-8", errors="replace").rstrip("\r")
+
+            self.exit_code = channel.recv_exit_status()
+            while channel.recv_stderr_ready():
+                stderr_chunks.append(channel.recv_stderr(_STREAM_RECV_SIZE))
+            self.stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+            logger.debug(
+                "Command on %s finished with exit code %s",
+                self.host_name,
+                self.exit_code,
+            )
+        finally:
+            self.channel.close()
+
 
 class SSHConnection:
     """Manages SSH connection to a single host."""
@@ -83,6 +157,13 @@ class SSHConnection:
                 final_username,
             )
             self.client.connect(**connect_kwargs)
+
+            # One session serves OS detection, cache refresh and the update
+            # check; keepalives stop it being dropped while a command is idle
+            keepalive_interval = self.ssh_config.get("keepalive_interval", 30)
+            if keepalive_interval:
+                self.client.get_transport().set_keepalive(int(keepalive_interval))
+
             self.connected = True
             logger.info("Successfully connected to %s", self.host.name)
             return True
@@ -126,6 +207,27 @@ class SSHConnection:
             logger.error("Error executing command on %s: %s", self.host.name, e)
             return -1, "", str(e)
 
+    def execute_command_stream(self, command: str, timeout: int = 60) -> CommandStream:
+        """
+        Execute a command on the remote host, streaming its output.
+
+        Args:
+            command: Command to execute
+            timeout: Command timeout in seconds
+
+        Returns:
+            CommandStream yielding stdout lines; its exit_code and stderr are
+            available after iteration
+        """
+        if not self.connected or not self.client:
+            raise RuntimeError(f"Not connected to {self.host.name}")
+
+        logger.debug("Streaming command on %s: %s", self.host.name, command)
+        channel = self.client.get_transport().open_session(timeout=timeout)
+        channel.settimeout(timeout)
+        channel.exec_command(command)
+        return CommandStream(self.host.name, channel)
+
     def disconnect(self):
         """Disconnect from the host."""
         if self.client:
@@ -153,6 +255,7 @@ class SSHManager:
     def __init__(self, ssh_config: Dict[str, Any]):
         self.ssh_config = ssh_config
         self.connections = {}
+        self._connections_lock = threading.Lock()
 
     def connect_to_host(self, host: Host, **kwargs) -> Optional[SSHConnection]:
         """
@@ -168,14 +271,15 @@ class SSHManager:
         connection = SSHConnection(host, self.ssh_config)
 
         if connection.connect(**kwargs):
-            self.connections[host.name] = connection
+            with self._connections_lock:
+                self.connections[host.name] = connection
             return connection
 
         return None
 
     def connect_to_hosts(self, hosts: list, **kwargs) -> Dict[str, SSHConnection]:
         """
-        Connect to multiple hosts.
+        Connect to multiple hosts concurrently.
 
         Args:
             hosts: List of Host objects
@@ -185,11 +289,18 @@ class SSHManager:
             Dictionary mapping host names to SSHConnection objects
         """
         successful_connections = {}
-
-        for host in hosts:
-            connection = self.connect_to_host(host, **kwargs)
-            if connection:
-                successful_connections[host.name] = connection
+        if not hosts:
+            return successful_connections
+
+        with ThreadPoolExecutor(
+            max_workers=min(_MAX_SSH_WORKERS, len(hosts))
+        ) as executor:
+            connections = executor.map(
+                lambda host: self.connect_to_host(host, **kwargs), hosts
+            )
+            for host, connection in zip(hosts, connections):
+                if connection:
+                    successful_connections[host.name] = connection
 
         logger.info("Connected to %s/%s hosts", len(successful_connections), len(hosts))
         return successful_connections
@@ -217,7 +328,7 @@ class SSHManager:
         self, command: str, **kwargs
     ) -> Dict[str, Tuple[int, str, str]]:
         """
-        Execute command on all connected hosts.
+        Execute command on all connected hosts concurrently.
 
         Args:
             command: Command to execute
@@ -226,16 +337,27 @@ class SSHManager:
         Returns:
             Dictionary mapping host names to (exit_code, stdout, stderr) tuples
         """
-        results = {}
+        with self._connections_lock:
+            connections = list(self.connections.items())
+        if not connections:
+            return {}
 
-        for host_name, connection in self.connections.items():
+        def execute(item: Tuple[str, SSHConnection]) -> Tuple[int, str, str]:
+            host_name, connection = item
             try:
-                results[host_name] = connection.execute_command(command, **kwargs)
+                return connection.execute_command(command, **kwargs)
             except Exception as e:
                 logger.error("Error executing command on %s: %s", host_name, e)
-                results[host_name] = (-1, "", str(e))
-
-        return results
+                return (-1, "", str(e))
+
+        with ThreadPoolExecutor(
+            max_workers=min(_MAX_SSH_WORKERS, len(connections))
+        ) as executor:
+            results = executor.map(execute, connections)
+            return {
+                host_name: result
+                for (host_name, _connection), result in zip(connections, results)
+            }
 
     def disconnect_all(self):
         """Disconnect from all hosts."""
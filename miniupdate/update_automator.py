@@ -10,35 +10,20 @@ import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional, NamedTuple
-from enum import Enum
 
 from .config import Config
 from .inventory import Host
 from .ssh_manager import SSHManager
-from .os_detector import OSDetector
+from .os_detector import OSDetector, OSInfoCache
 from .package_managers import get_package_manager, PackageUpdate
 from .proxmox_client import ProxmoxClient, ProxmoxAPIError
 from .vm_mapping import VMMapper, VMMapping
 from .host_checker import HostChecker
-from .email_sender import UpdateReport
+from .email_sender import UpdateReport, UpdateResult
 
 logger = logging.getLogger(__name__)
 
 
-class UpdateResult(Enum):
-    """Update operation results."""
-
-    SUCCESS = "success"
-    OPT_OUT = "opt_out"
-    NO_UPDATES = "no_updates"
-    FAILED_SNAPSHOT = "failed_snapshot"
-    FAILED_UPDATES = "failed_updates"
-    FAILED_REBOOT = "failed_reboot"
-    FAILED_AVAILABILITY = "failed_availability"
-    REVERTED = "reverted"
-    REVERT_FAILED = "revert_failed"
-
-
 class AutomatedUpdateReport(NamedTuple):
     """Report for automated update process."""
 
@@ -71,6 +56,7 @@ class UpdateAutomator:
         self.proxmox_client = None
         self.vm_mapper = None
         self.host_checker = HostChecker(self.ssh_config)
+        self.os_cache = OSInfoCache(config.settings_config)
 
         # Setup Proxmox client if configured
         if self.proxmox_config:
@@ -170,7 +156,7 @@ class UpdateAutomator:
                     )
 
                 # Detect OS and get package manager
-                os_detector = OSDetector(connection)
+                os_detector = OSDetector(connection, self.os_cache)
                 os_info = os_detector.detect_os()
 
                 if not os_info:
@@ -10,7 +10,12 @@ import sys
 from pathlib import Path
 from typing import Dict, Any, Optional, NamedTuple
 
-import toml
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+import tomli_w
 
 logger = logging.getLogger(__name__)
 
@@ -67,8 +72,8 @@ class VMMapper:
             return mappings
 
         try:
-            with open(self.mapping_path, "r", encoding="utf-8") as f:
-                config = toml.load(f)
+            data = self.mapping_path.read_bytes()
+            config = tomllib.loads(data.decode("utf-8"))
 
             vms = config.get("vms", {})
             for host_name, vm_info in vms.items():
@@ -165,4 +170,4 @@ def create_example_vm_mapping(path: str = "vm_mapping.toml.example") -> None:
             "for capacity-limited storage\n\n"
         )
 
-        toml.dump(example_config, f)
+        f.write(tomli_w.dumps(example_config))
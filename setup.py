@@ -20,7 +20,13 @@ if requirements_path.exists():
             line.strip() for line in f if line.strip() and not line.startswith("#")
         ]
 else:
-    requirements = ["paramiko>=3.0.0", "PyYAML>=6.0", "toml>=0.10.2", "click>=8.0.0"]
+    requirements = [
+        "paramiko>=3.0.0",
+        "PyYAML>=6.0",
+        'tomli>=1.1.0; python_version < "3.11"',
+        "tomli-w>=1.0.0",
+        "click>=8.0.0",
+    ]
 
 setup(
     name="miniupdate",